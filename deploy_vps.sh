@@ -194,6 +194,9 @@ PY
   upsert_env "DJANGO_ALLOWED_HOSTS" "$allowed_hosts"
   upsert_env "DJANGO_BEHIND_HTTPS" "False"
   upsert_env "PYTHONUNBUFFERED" "1"
+  upsert_env "DJANGO_WARMUP_ON_BOOT" "True"
+  upsert_env "DJANGO_SERVE_MEDIA" "False"
+  upsert_env "DJANGO_MEDIA_SERVE_MODE" "nginx"
 
   chown "root:$APP_GROUP" "$ENV_FILE"
   chmod 640 "$ENV_FILE"
@@ -212,6 +215,9 @@ django_prepare() {
     set +a
     '$VENV_DIR/bin/python' manage.py migrate --noinput
     '$VENV_DIR/bin/python' manage.py collectstatic --noinput
+    # a deploy-time check (templates compile, search index builds); it does
+    # not warm gunicorn workers, they warm themselves (wsgi.py + post_worker_init)
+    '$VENV_DIR/bin/python' manage.py warmup
   "
 }
 
@@ -228,7 +234,7 @@ User=$APP_USER
 Group=$APP_GROUP
 WorkingDirectory=$APP_DIR
 EnvironmentFile=$ENV_FILE
-ExecStart=$VENV_DIR/bin/gunicorn --workers $WORKERS --bind $BIND_ADDRESS:$APP_PORT --timeout 120 --access-logfile - --error-logfile - kiyim_platform.wsgi:application
+ExecStart=$VENV_DIR/bin/gunicorn -c $APP_DIR/kiyim_platform/gunicorn.conf.py --preload --workers $WORKERS --bind $BIND_ADDRESS:$APP_PORT --timeout 120 --access-logfile - --error-logfile - kiyim_platform.wsgi:application
 Restart=always
 RestartSec=5
 KillSignal=SIGQUIT
@@ -242,6 +248,55 @@ EOF
   systemctl enable --now "$SERVICE_NAME"
 }
 
+write_systemd_timer() {
+  local name="$1"
+  local schedule="$2"
+  local command="$3"
+  local unit="${APP_NAME}-${name}"
+
+  log "Writing systemd timer $unit.timer ($schedule)..."
+  cat >"/etc/systemd/system/$unit.service" <<EOF
+[Unit]
+Description=$APP_NAME $name
+After=network.target
+
+[Service]
+Type=oneshot
+User=$APP_USER
+Group=$APP_GROUP
+WorkingDirectory=$APP_DIR
+EnvironmentFile=$ENV_FILE
+ExecStart=$VENV_DIR/bin/python manage.py $command
+EOF
+
+  cat >"/etc/systemd/system/$unit.timer" <<EOF
+[Unit]
+Description=$APP_NAME $name schedule
+
+[Timer]
+OnCalendar=$schedule
+Persistent=true
+RandomizedDelaySec=60
+
+[Install]
+WantedBy=timers.target
+EOF
+
+  systemctl daemon-reload
+  systemctl enable --now "$unit.timer"
+}
+
+write_maintenance_timers() {
+  write_systemd_timer trending "*:0/15" compute_trending
+  write_systemd_timer clearsessions daily clearsessions
+  write_systemd_timer retention "*-*-* 03:30:00" retention
+  # SQLite read snapshot for catalog reads (a PostgreSQL replica needs no timer)
+  if grep -qE "^DJANGO_READ_DB_NAME=.+" "$ENV_FILE" && ! grep -qE "^DJANGO_READ_DB_ENGINE=.*postgresql" "$ENV_FILE"; then
+    grep -qE "^DJANGO_DB_STICKY_SECONDS=" "$ENV_FILE" || upsert_env "DJANGO_DB_STICKY_SECONDS" "180"
+    write_systemd_timer read-snapshot "*:0/1" snapshot_read_db
+  fi
+}
+
 check_nginx_domain_conflict() {
   local escaped_domain other_hits
   escaped_domain="${APP_DOMAIN//./\\.}"
@@ -273,7 +328,12 @@ write_nginx_config() {
   check_nginx_domain_conflict
 
   log "Writing nginx config at $NGINX_CONF..."
+  mkdir -p "/var/cache/nginx/${APP_NAME}"
+
   cat >"$NGINX_CONF" <<EOF
+# Micro-cache for anonymous catalog pages (lifetime set by X-Accel-Expires).
+proxy_cache_path /var/cache/nginx/${APP_NAME} levels=1:2 keys_zone=${APP_NAME}_micro:10m max_size=256m inactive=10m use_temp_path=off;
+
 server {
     listen 80;
     listen [::]:80;
@@ -294,6 +354,22 @@ server {
         expires 30d;
     }
 
+    # Private media: Django checks access and answers with X-Accel-Redirect.
+    location ~ ^/media/(avatars|tryon)/ {
+        proxy_pass http://$BIND_ADDRESS:$APP_PORT;
+        proxy_http_version 1.1;
+        proxy_set_header Host \$host;
+        proxy_set_header X-Real-IP \$remote_addr;
+        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto \$scheme;
+    }
+
+    location /protected-media/ {
+        internal;
+        alias $APP_DIR/media/;
+        access_log off;
+    }
+
     location / {
         proxy_pass http://$BIND_ADDRESS:$APP_PORT;
         proxy_http_version 1.1;
@@ -302,6 +378,15 @@ server {
         proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
         proxy_set_header X-Forwarded-Proto \$scheme;
         proxy_read_timeout 120;
+
+        proxy_cache ${APP_NAME}_micro;
+        proxy_cache_lock on;
+        proxy_cache_revalidate on;
+        proxy_cache_use_stale updating error timeout;
+        proxy_cache_bypass \$cookie_sessionid \$cookie_messages \$http_authorization;
+        proxy_no_cache \$cookie_sessionid \$cookie_messages \$http_authorization;
+        proxy_ignore_headers Vary;
+        add_header X-Cache-Status \$upstream_cache_status;
     }
 }
 EOF
@@ -388,6 +473,7 @@ main() {
   write_env_file
   django_prepare
   write_systemd_service
+  write_maintenance_timers
   write_nginx_config
   setup_ssl_if_possible
   print_summary
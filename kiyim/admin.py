@@ -1,12 +1,211 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Product, ProductImage, ProductSize, Cart, Order, OrderItem, Review
-
-admin.site.register(User, UserAdmin)
-admin.site.register(Product)
-admin.site.register(ProductImage)
-admin.site.register(ProductSize)
-admin.site.register(Cart)
-admin.site.register(Order)
-admin.site.register(OrderItem)
-admin.site.register(Review)
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+
+from .models import User, Product, ProductImage, ProductSize, Cart, Order, OrderItem, Review, ArchivedOrder, ArchivedOrderItem
+from .product_cache import bump_version
+from .services import refresh_product_stock
+
+
+class EstimatedCountPaginator(Paginator):
+    """Фильтрсиз changelist-те ``COUNT(*)`` орнына кесте бағалаўын алыў.
+
+    SQLite-та ``ANALYZE`` кейинги ``sqlite_stat1`` яки ``MAX(rowid)``,
+    PostgreSQL-да ``pg_class.reltuples`` қолланылады. Киши кестелер ҳәм
+    фильтрли сораўлар әдеттегидей дәл саналады.
+    """
+    exact_below = 10000
+
+    def _estimate(self):
+        table = self.object_list.model._meta.db_table
+        connection = connections[self.object_list.db]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone():
+                    # the first number of every row is the table's row count
+                    # (idx IS NULL only exists for tables without indexes)
+                    cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+                    counts = [int(stat.split()[0]) for stat, in cursor.fetchall() if stat]
+                    if counts:
+                        return max(counts)
+                cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.where:
+            return super().count
+        estimate = self._estimate()
+        if estimate is None or estimate < self.exact_below:
+            return super().count
+        return estimate
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class ProductSizeInline(admin.TabularInline):
+    model = ProductSize
+    extra = 0
+
+
+class ProductImageInline(admin.TabularInline):
+    model = ProductImage
+    extra = 0
+    fields = ['image', 'order']
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ['product']
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    raw_id_fields = ['seller']
+
+
+@admin.register(User)
+class KiyimUserAdmin(UserAdmin):
+    list_display = ['username', 'first_name', 'last_name', 'role', 'shop_name', 'phone', 'is_staff']
+    list_filter = ['role', 'is_staff', 'is_active']
+    search_fields = ['username', 'first_name', 'last_name', 'shop_name', 'phone']
+    fieldsets = UserAdmin.fieldsets + (
+        ('MODA', {'fields': ['role', 'phone', 'gender', 'height', 'weight', 'size', 'avatar', 'shop_name']}),
+    )
+
+
+@admin.register(Product)
+class ProductAdmin(LargeTableAdmin):
+    list_display = ['name', 'seller', 'category', 'price', 'gender', 'is_active', 'total_stock', 'views_count', 'created_at']
+    list_select_related = ['seller']
+    list_filter = ['is_active', 'category', 'gender', 'style']
+    # LIKE '%q%' can't use an index: a search scans the (filtered) rows
+    search_fields = ['name', 'seller__shop_name']
+    autocomplete_fields = ['seller']
+    readonly_fields = ['size_mask', 'total_stock']
+    inlines = [ProductSizeInline, ProductImageInline]
+    actions = ['deactivate', 'activate', 'restock']
+
+    def _set_active(self, request, queryset, value):
+        pks = list(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = Product.objects.filter(pk__in=pks).update(is_active=value)
+            transaction.on_commit(lambda: [bump_version(pk) for pk in pks])
+        self.message_user(request, f'{updated} өним жаңаланды.', messages.SUCCESS)
+
+    @admin.action(description='Таңланған өнимлерди өшириў (deactivate)')
+    def deactivate(self, request, queryset):
+        self._set_active(request, queryset, False)
+
+    @admin.action(description='Таңланған өнимлерди қайта қосыў (activate)')
+    def activate(self, request, queryset):
+        self._set_active(request, queryset, True)
+
+    @admin.action(description='Барлық размерлерге +10 дона қосыў (restock)')
+    def restock(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = ProductSize.objects.filter(product_id__in=pks).update(quantity=F('quantity') + 10)
+            refresh_product_stock(pks)
+            transaction.on_commit(lambda: [bump_version(pk) for pk in pks])
+        self.message_user(request, f'{updated} размер толтырылды.', messages.SUCCESS)
+
+
+@admin.register(ProductImage)
+class ProductImageAdmin(LargeTableAdmin):
+    list_display = ['product', 'image', 'order']
+    list_select_related = ['product']
+    raw_id_fields = ['product']
+
+
+@admin.register(ProductSize)
+class ProductSizeAdmin(LargeTableAdmin):
+    list_display = ['product', 'size', 'quantity']
+    list_select_related = ['product']
+    list_filter = ['size']
+    search_fields = ['product__name']
+    raw_id_fields = ['product']
+
+
+@admin.register(Cart)
+class CartAdmin(LargeTableAdmin):
+    list_display = ['user', 'product', 'size', 'quantity', 'added_at']
+    list_select_related = ['user', 'product']
+    list_filter = ['added_at']
+    search_fields = ['user__username', 'product__name']
+    raw_id_fields = ['user', 'product']
+    date_hierarchy = 'added_at'
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ['id', 'user', 'status', 'total_price', 'created_at']
+    list_select_related = ['user']
+    list_filter = ['status', 'created_at']
+    search_fields = ['=id', 'user__username', 'user__phone']
+    raw_id_fields = ['user']
+    date_hierarchy = 'created_at'
+    inlines = [OrderItemInline]
+    actions = ['mark_accepted', 'mark_shipped', 'mark_delivered', 'mark_cancelled']
+
+    def _set_status(self, request, queryset, status):
+        updated = Order.objects.filter(pk__in=queryset.values('pk')).update(status=status)
+        self.message_user(request, f'{updated} буйрытма статусы жаңаланды.', messages.SUCCESS)
+
+    @admin.action(description='Статус: Қабыл алынды')
+    def mark_accepted(self, request, queryset):
+        self._set_status(request, queryset, 'accepted')
+
+    @admin.action(description='Статус: Жолда')
+    def mark_shipped(self, request, queryset):
+        self._set_status(request, queryset, 'shipped')
+
+    @admin.action(description='Статус: Жеткерилди')
+    def mark_delivered(self, request, queryset):
+        self._set_status(request, queryset, 'delivered')
+
+    @admin.action(description='Статус: Бас тартылды')
+    def mark_cancelled(self, request, queryset):
+        self._set_status(request, queryset, 'cancelled')
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin):
+    list_display = ['id', 'user', 'status', 'total_price', 'created_at', 'archived_at']
+    list_select_related = ['user']
+    list_filter = ['status']
+    search_fields = ['=id', 'user__username']
+    raw_id_fields = ['user']
+    inlines = [ArchivedOrderItemInline]
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(LargeTableAdmin):
+    list_display = ['order', 'product', 'size', 'quantity', 'price']
+    list_select_related = ['order', 'product']
+    search_fields = ['=order__id', 'product__name']
+    raw_id_fields = ['order', 'product']
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ['product', 'user', 'rating', 'created_at']
+    list_select_related = ['product', 'user']
+    list_filter = ['rating', 'created_at']
+    search_fields = ['product__name', 'user__username']
+    raw_id_fields = ['product', 'user']
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_TIMEOUT = 300
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def evict_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """Ҳәр сораўда ``User`` қатарын базадан емес, кэштен алыў.
+
+    Кэшке пароль хэши жазылмайды: тек қалған майданлардың шийки мәнислери
+    ҳәм session auth hash (пароль хэшиниң ``SECRET_KEY`` пенен HMAC-ы)
+    сақланады. Кэштен тикленген ``User``-де ``password`` deferred — оған
+    мүрәжат етилсе базадан жүкленеди, ал ``save()`` тек жүкленген
+    майданларды жазады.
+
+    ``User`` сақланғанда яки өширилгенде сигнал кэшти тазалайды, сонда
+    пароль өзгерсе session auth hash тексериўи дәрҳал ислейди.
+    ``User.objects.filter(...).update(...)`` сигнал жибермейди — ондай
+    жерде ``evict_user(pk)`` шақырылыўы керек, болмаса жазба
+    ``USER_CACHE_TIMEOUT`` өткенше ескиде қалады.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user, entry = self._load(user_id)
+            if user is None:
+                return None
+            cache.set(key, entry, USER_CACHE_TIMEOUT)
+        else:
+            user = self._restore(entry)
+        return user if self.user_can_authenticate(user) else None
+
+    def _load(self, user_id):
+        UserModel = get_user_model()
+        queryset = UserModel._default_manager.filter(pk=user_id)
+        names = [f.attname for f in UserModel._meta.concrete_fields]
+        row = queryset.values_list(*names).first()
+        if row is None:
+            return None, None
+        user = UserModel.from_db(queryset.db, names, row)
+        fields = {name: value for name, value in zip(names, row) if name != 'password'}
+        return user, {'db': queryset.db, 'fields': fields, 'session_hash': user.get_session_auth_hash()}
+
+    def _restore(self, entry):
+        fields = entry['fields']
+        user = get_user_model().from_db(entry['db'], list(fields), list(fields.values()))
+        session_hash = entry['session_hash']
+        # the real method needs the password, which is not cached
+        user.get_session_auth_hash = lambda: session_hash
+        return user
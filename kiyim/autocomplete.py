@@ -0,0 +1,250 @@
+"""Іздеў autocomplete ушын процесс ишиндеги prefix индекси.
+
+Актив өнимлердиң атлары, категориялар ҳәм дүкан атлары ``casefold``
+етилген гилтлерге айландырылып, сортланған ``(гилт, entry)`` дизиминде
+сақланады; излеў ``bisect`` пенен — базаға бир де сораў жоқ.
+Ҳәр сөзден басланатуғын гилт те қосылады ("қара куртка" → "куртка").
+
+Индекс глобал каталог версиясын (``product_cache.get_catalog_version``)
+ең көбинде ``AUTOCOMPLETE_REFRESH_SECONDS`` сайын тексереди; өзгерсе
+жеңил ``values_list`` оқылып, тек өзгерген өнимлердиң гилтлери
+алмастырылады. Индекс ``AUTOCOMPLETE_MEMORY_BUDGET_MB`` шегинен асса
+ең аз популяр өнимлер тасланады.
+"""
+import sys
+import threading
+import time
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from .db_router import primary_unless_covered
+from .models import CATEGORY_CHOICES, Product
+from .product_cache import get_catalog_version
+
+# rough per-key overhead of the (key, entry) tuple and list slot, in bytes
+KEY_OVERHEAD = 120
+# more changes than this share of products -> rebuild from scratch
+FULL_REBUILD_SHARE = 0.1
+# results for prefixes this short are memoized until the next update
+MEMO_PREFIX_LEN = 2
+
+
+def normalize(text):
+    return ' '.join(unicodedata.normalize('NFC', text or '').casefold().split())
+
+
+def index_keys(label):
+    """Толық аты ҳәм ҳәр кейинги сөзден басланатуғын бөлими."""
+    words = normalize(label).split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+def _popularity(views, trending):
+    return trending * 10 + views
+
+
+class _Tables:
+    """Индекстиң бир нусқасы; жарияланғаннан кейин өзгертилмейди.
+
+    Жаңалаў ``copy()`` үстинде ислейди ҳәм ``PrefixIndex.tables`` бир
+    меншиклеў менен алмастырылады — басқа ағымлар ески нусқаны толық,
+    жаңасын толық көреди. ``entries`` мәнислери кортеж, сонда көширме
+    ески нусқа менен өзгермели объектлерди бөлиспейди.
+    """
+
+    def __init__(self, keys=None, entries=None, products=None, used=0, excluded=frozenset()):
+        self.keys = keys if keys is not None else []                # sorted [(key, entry)]
+        self.entries = entries if entries is not None else {}       # entry -> (label, popularity)
+        self.products = products if products is not None else {}    # pk -> (name, category, shop_name)
+        self.bytes = used
+        # active products left out by rebuild() for the memory budget
+        self.excluded = excluded
+        self.memo = {}
+
+    def copy(self):
+        return _Tables(list(self.keys), dict(self.entries), dict(self.products), self.bytes, self.excluded)
+
+    def add(self, entry, label, popularity):
+        self.entries[entry] = (label, popularity)
+        for key in index_keys(label):
+            insort(self.keys, (key, entry))
+            self.bytes += sys.getsizeof(key) + KEY_OVERHEAD
+
+    def remove(self, entry):
+        label, _ = self.entries.pop(entry)
+        for key in index_keys(label):
+            i = bisect_left(self.keys, (key, entry))
+            if i < len(self.keys) and self.keys[i] == (key, entry):
+                del self.keys[i]
+                self.bytes -= sys.getsizeof(key) + KEY_OVERHEAD
+
+    def _aggregates(self):
+        """Категория ҳәм дүкан популярлығы — өнимлериниң қосындысы."""
+        category_labels = dict(CATEGORY_CHOICES)
+        totals = {}
+        for pk, (name, category, shop_name) in self.products.items():
+            popularity = self.entries[('p', pk)][1]
+            totals[('c', category)] = totals.get(('c', category), 0) + popularity
+            if shop_name:
+                totals[('s', shop_name)] = totals.get(('s', shop_name), 0) + popularity
+        labels = {entry: category_labels.get(entry[1], entry[1]) if entry[0] == 'c' else entry[1]
+                  for entry in totals}
+        return labels, totals
+
+    def sync_aggregates(self):
+        labels, totals = self._aggregates()
+        for entry in [e for e in self.entries if e[0] != 'p' and e not in totals]:
+            self.remove(entry)
+        for entry, popularity in totals.items():
+            if entry in self.entries:
+                self.entries[entry] = (self.entries[entry][0], popularity)
+            else:
+                self.add(entry, labels[entry], popularity)
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.tables = _Tables()
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def keys(self):
+        return self.tables.keys
+
+    @property
+    def entries(self):
+        return self.tables.entries
+
+    @property
+    def bytes(self):
+        return self.tables.bytes
+
+    # --- building -------------------------------------------------------
+
+    def _rows(self):
+        return Product.objects.filter(is_active=True).values_list(
+            'pk', 'name', 'category', 'seller__shop_name', 'views_count', 'trending_score',
+        )
+
+    def rebuild(self, rows=None):
+        budget = settings.AUTOCOMPLETE_MEMORY_BUDGET_MB * 1024 * 1024
+        rows = sorted(rows if rows is not None else self._rows(), key=lambda r: -_popularity(r[4], r[5]))
+        pairs, entries, products, used = [], {}, {}, 0
+        for n, (pk, name, category, shop_name, views, trending) in enumerate(rows):
+            keys = index_keys(name)
+            cost = sum(sys.getsizeof(key) + KEY_OVERHEAD for key in keys)
+            if used + cost > budget:
+                # the rest are less popular; leave them out of the index
+                excluded = frozenset(row[0] for row in rows[n:])
+                break
+            used += cost
+            entries[('p', pk)] = (name, _popularity(views, trending))
+            products[pk] = (name, category, shop_name)
+            pairs.extend((key, ('p', pk)) for key in keys)
+        else:
+            excluded = frozenset()
+        pairs.sort()
+        tables = _Tables(pairs, entries, products, used, excluded)
+        tables.sync_aggregates()
+        self.tables = tables
+
+    def apply_changes(self, rows):
+        """Тек өзгерген өнимлердиң гилтлерин алмастырыў (инкрементал).
+
+        Бюджет ушын шетте қалған өнимлер өзгерген есапланбайды — олар
+        тек кейинги толық ``rebuild()``-те қайта бәсекелеседи.
+        """
+        rows = list(rows)
+        current = self.tables
+        seen = {}
+        changed = set()
+        for pk, name, category, shop_name, views, trending in rows:
+            seen[pk] = (name, category, shop_name)
+            if pk not in current.excluded and current.products.get(pk) != seen[pk]:
+                changed.add(pk)
+        removed = {pk for pk in current.products if pk not in seen}
+        if len(changed) + len(removed) > max(len(rows), 1) * FULL_REBUILD_SHARE:
+            return self.rebuild(rows)
+
+        # copy-on-write: searches keep reading ``current`` until the swap below
+        tables = current.copy()
+        tables.excluded = current.excluded.intersection(seen)
+        for pk in removed | changed:
+            if ('p', pk) in tables.entries:
+                tables.remove(('p', pk))
+            tables.products.pop(pk, None)
+        for pk, name, category, shop_name, views, trending in rows:
+            popularity = _popularity(views, trending)
+            if pk in tables.products:
+                tables.entries[('p', pk)] = (name, popularity)
+            elif pk in changed:
+                tables.add(('p', pk), name, popularity)
+                tables.products[pk] = (name, category, shop_name)
+        if tables.bytes > settings.AUTOCOMPLETE_MEMORY_BUDGET_MB * 1024 * 1024:
+            return self.rebuild(rows)
+        tables.sync_aggregates()
+        self.tables = tables
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.checked_at < settings.AUTOCOMPLETE_REFRESH_SECONDS:
+            return
+        with self.lock:
+            self.checked_at = now
+            version = get_catalog_version()
+            if version == self.version and not force:
+                return
+            with primary_unless_covered(version):
+                if self.version is None or force:
+                    self.rebuild()
+                else:
+                    self.apply_changes(self._rows())
+            self.version = version
+
+    # --- lookup ---------------------------------------------------------
+
+    def search(self, query, limit=8):
+        """``[(entry, label, popularity)]`` — популярлық бойынша.
+
+        Prefix-ке сәйкес барлық гилтлер қаралып, олардың ишинен ең
+        популярлары алынады. Көп гилтке сәйкес келетуғын қысқа сораўлардың
+        нәтийжеси ``memo``-да индекстиң келеси жаңаланыўына шекем турады.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        # one read of ``tables``: keys, entries and memo come from the same version
+        tables = self.tables
+        memo = tables.memo
+        if len(prefix) <= MEMO_PREFIX_LEN and (prefix, limit) in memo:
+            return memo[prefix, limit]
+        found = set()
+        keys, entries = tables.keys, tables.entries
+        # keys sharing the prefix form one contiguous run; past it nothing matches
+        end = bisect_left(keys, (prefix + '\U0010ffff',))
+        for i in range(bisect_left(keys, (prefix,)), end):
+            entry = keys[i][1]
+            if entry in entries:
+                found.add(entry)
+        ranked = heapq.nlargest(limit, found, key=lambda entry: entries[entry][1])
+        results = [(entry, entries[entry][0], entries[entry][1]) for entry in ranked]
+        if len(prefix) <= MEMO_PREFIX_LEN:
+            memo[prefix, limit] = results
+        return results
+
+
+_index = PrefixIndex()
+
+
+def get_index():
+    _index.refresh()
+    return _index
+
+
+def suggest(query, limit=8):
+    return get_index().search(query, limit=limit)
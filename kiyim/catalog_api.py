@@ -0,0 +1,251 @@
+"""Каталогтың read-only JSON API-и (``/api/v1/``).
+
+Қатарлар моделлер жаратылмастан ``values_list`` кортежлеринен тиккелей
+dict-ке айландырылады; размерлер, суретлер ҳәм рейтинг ҳәр бет ушын бир
+сораўдан алынады ҳәм тек ``?fields=`` сораса ғана. Бетлер keyset
+курсоры (``?cursor=``) менен — OFFSET жоқ, терең бетлер де арзан.
+Фильтрлер ``product_list`` пенен бирдей (``services.filter_products``).
+
+Жуўаплар ``orjson`` пенен кодланады (requirements.txt); ол жоқ
+орталықта стандарт ``json`` қолланылады.
+"""
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is the fallback
+    orjson = None
+
+from django.db.models import Avg, Count, Q
+
+from .models import Product, ProductImage, ProductSize, Review
+from .services import SORTS, filter_products, parse_price
+
+API_VERSION = 1
+DEFAULT_LIMIT = 24
+MAX_LIMIT = 100
+
+# public field -> Product lookup read with values_list()
+COLUMNS = {
+    'id': 'pk',
+    'name': 'name',
+    'category': 'category',
+    'gender': 'gender',
+    'style': 'style',
+    'price': 'price',
+    'description': 'description',
+    'shop': 'seller__shop_name',
+    'views': 'views_count',
+    'created_at': 'created_at',
+}
+# fields loaded with one extra query per page
+RELATED = ('sizes', 'images', 'rating', 'review_count')
+ALL_FIELDS = tuple(COLUMNS) + RELATED
+DEFAULT_FIELDS = ('id', 'name', 'category', 'gender', 'price', 'shop', 'images', 'rating')
+
+
+class ApiError(ValueError):
+    pass
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} JSON-ға айландырылмайды')
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_default).encode()
+
+
+def parse_fields(value):
+    if not value:
+        return DEFAULT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in ALL_FIELDS]
+    if unknown:
+        raise ApiError(f'Белгисиз fields: {", ".join(unknown)}')
+    return fields
+
+
+def parse_limit(value):
+    if not value:
+        return DEFAULT_LIMIT
+    try:
+        return min(max(int(value), 1), MAX_LIMIT)
+    except ValueError:
+        raise ApiError('limit сан болыўы керек')
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([str(value) if isinstance(value, Decimal) else value, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return value, int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        raise ApiError('cursor қәте')
+
+
+def _sort(params):
+    sort = params.get('sort') or 'new'
+    if sort not in SORTS:
+        raise ApiError(f'sort: {", ".join(SORTS)} болыўы керек')
+    return SORTS[sort]
+
+
+def _check_prices(params):
+    for name in ('min_price', 'max_price'):
+        if params.get(name) not in (None, '') and parse_price(params[name]) is None:
+            raise ApiError(f'{name} сан болыўы керек')
+
+
+def _queryset(params):
+    _check_prices(params)
+    return filter_products(Product.objects.filter(is_active=True), params)
+
+
+def _cursor_value(column, value):
+    """Курсордағы мәнисти бағана типине келтириў; сәйкес келмесе ``ApiError``."""
+    try:
+        if column == 'price':
+            value = Decimal(str(value))
+            if value.is_finite():
+                return value
+        elif column == 'views_count':
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        else:
+            return value
+    except InvalidOperation:
+        pass
+    raise ApiError('cursor қәте')
+
+
+def _after(queryset, column, descending, cursor):
+    value, pk = decode_cursor(cursor)
+    value = _cursor_value(column, value)
+    op = 'lt' if descending else 'gt'
+    if column == 'pk':
+        return queryset.filter(**{f'pk__{op}': pk})
+    return queryset.filter(Q(**{f'{column}__{op}': value}) | Q(**{column: value, f'pk__{op}': pk}))
+
+
+def _rows(queryset, fields, column, descending, count):
+    """``values_list`` кортежлеринен dict-лер ҳәм ҳәр қатардың keyset гилти."""
+    names = ['id'] + [f for f in fields if f in COLUMNS and f != 'id']
+    lookups = [COLUMNS[name] for name in names]
+    if column not in lookups:
+        lookups.append(column)
+    prefix = '-' if descending else ''
+    rows = queryset.order_by(f'{prefix}{column}', f'{prefix}pk').values_list(*lookups)[:count]
+
+    sort_at = lookups.index(column)
+    items, keys = [], []
+    for row in rows:
+        item = dict(zip(names, row))
+        if 'created_at' in item:
+            item['created_at'] = item['created_at'].isoformat()
+        items.append(item)
+        keys.append((row[sort_at], row[0]))
+    return items, keys
+
+
+def _attach_related(items, fields):
+    wanted = [f for f in fields if f in RELATED]
+    if not items or not wanted:
+        return
+    by_pk = {item['id']: item for item in items}
+    pks = list(by_pk)
+
+    if 'sizes' in wanted:
+        for item in items:
+            item['sizes'] = {}
+        for product_id, size, qty in ProductSize.objects.filter(product_id__in=pks).values_list(
+                'product_id', 'size', 'quantity'):
+            by_pk[product_id]['sizes'][size] = qty
+
+    if 'images' in wanted:
+        storage = ProductImage._meta.get_field('image').storage
+        for item in items:
+            item['images'] = []
+        for product_id, name in ProductImage.objects.filter(product_id__in=pks).order_by(
+                'order', 'pk').values_list('product_id', 'image'):
+            by_pk[product_id]['images'].append(storage.url(name))
+
+    if 'rating' in wanted or 'review_count' in wanted:
+        stats = {
+            product_id: (avg, count)
+            for product_id, avg, count in Review.objects.filter(product_id__in=pks)
+            .values('product_id').annotate(avg=Avg('rating'), count=Count('pk'))
+            .values_list('product_id', 'avg', 'count')
+        }
+        for pk, item in by_pk.items():
+            avg, count = stats.get(pk, (None, 0))
+            if 'rating' in wanted:
+                item['rating'] = round(avg, 1) if avg is not None else None
+            if 'review_count' in wanted:
+                item['review_count'] = count
+
+
+def _finish(items, fields):
+    if 'id' not in fields:
+        for item in items:
+            del item['id']
+    return items
+
+
+def list_products(params, fields, limit):
+    """Бир бет: ``(items, next_cursor)``."""
+    column, descending = _sort(params)
+    queryset = _queryset(params)
+    if params.get('cursor'):
+        queryset = _after(queryset, column, descending, params['cursor'])
+    # one extra row tells whether a next page exists
+    items, keys = _rows(queryset, fields, column, descending, limit + 1)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(*keys[limit - 1])
+    _attach_related(items, fields)
+    return _finish(items, fields), next_cursor
+
+
+def get_product(pk, fields):
+    items, _ = _rows(Product.objects.filter(pk=pk, is_active=True), fields, 'pk', False, 1)
+    if not items:
+        return None
+    _attach_related(items, fields)
+    return _finish(items, fields)[0]
+
+
+def iter_export(params, fields, chunk_size=500):
+    """Барлық сәйкес өнимлер NDJSON қатарлары болып, keyset бөлимлер менен.
+
+    Параметрлер дәрҳал тексериледи, сонда қәте стрим басланбастан шығады.
+    """
+    column, descending = _sort(params)
+    return _iter_export(_queryset(params), fields, column, descending, chunk_size)
+
+
+def _iter_export(queryset, fields, column, descending, chunk_size):
+    page = queryset
+    while True:
+        items, keys = _rows(page, fields, column, descending, chunk_size)
+        if not items:
+            return
+        _attach_related(items, fields)
+        for item in _finish(items, fields):
+            yield dumps(item) + b'\n'
+        if len(items) < chunk_size:
+            return
+        page = _after(queryset, column, descending, encode_cursor(*keys[-1]))
@@ -0,0 +1,281 @@
+"""Сатыўшы каталогын CSV/JSONL арқалы импорт ҳәм экспорт етиў.
+
+Импорт файлы қатарма-қатар оқылады, ``batch_size`` қатар жыйналғанда
+валидация етилип ``bulk_create`` менен өз транзакциясында жазылады, сонда
+жад ҳәм SQLite write-lock файл үлкенлигине байланыслы болмайды. ZIP
+ишиндеги суретлер қатар тексерилгенде өлшеми ҳәм ``verify_image`` пенен
+тексериледи, жазыўда транзакциядан бурын бирим-бирим storage-қа ағым
+менен көшириледи.
+
+Бағаналар: name, category, price, gender, style, description,
+sizes (``S:3;M:5``), images (ZIP ишиндеги файл атлары, ``a.jpg;b.jpg``).
+"""
+import csv
+import io
+import json
+import posixpath
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from .forms import ProductForm
+from .imaging import ImageRejected, verify_image
+from .models import ArchivedOrderItem, OrderItem, Product, ProductImage, ProductSize
+from .product_cache import bump_catalog_version
+from .services import MAX_PRODUCT_IMAGES, parse_sizes, refresh_product_stock
+
+CATALOG_FIELDS = ['name', 'category', 'price', 'gender', 'style', 'description', 'sizes', 'images']
+ORDER_FIELDS = ['order', 'created_at', 'status', 'customer', 'product_id', 'product', 'size', 'quantity', 'price']
+MAX_REPORTED_ERRORS = 200
+# the rest of the file can't be read after these; reported once per file
+FILE_ERRORS = (UnicodeDecodeError, csv.Error, json.JSONDecodeError)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.file_error = None
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def iter_rows(stream, fmt):
+    """Ҳәр қатарды ``(line_no, dict)`` түринде бериў; файл толық оқылмайды."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        if fmt == 'jsonl':
+            for line_no, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_no, exc
+                    continue
+                yield line_no, row if isinstance(row, dict) else ValueError('JSON объект күтилди')
+        else:
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+    finally:
+        # keep the caller's stream open
+        text.detach()
+
+
+def _file_error(exc):
+    if isinstance(exc, UnicodeDecodeError):
+        return 'Файл UTF-8 кодировкасында емес; UTF-8 етип сақлаң'
+    return f'Файлды оқыў мүмкин емес: {exc}'
+
+
+def _split_sizes(value):
+    if isinstance(value, dict):
+        return list(value.keys()), [str(v) for v in value.values()]
+    sizes, quantities = [], []
+    for part in str(value or '').split(';'):
+        size, _, qty = part.partition(':')
+        if size.strip():
+            sizes.append(size.strip().upper())
+            quantities.append(qty.strip())
+    return sizes, quantities
+
+
+def _split_images(value):
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value or '').split(';') if v.strip()]
+
+
+def _check_images(archive, names):
+    """Қатардың ZIP суретлерин тексериў; қәте болса хабар, әйтпесе ``None``."""
+    limit = settings.IMPORT_MAX_IMAGE_BYTES
+    for name in names:
+        # ZipExtFile stops at the declared size, so this also caps the bytes read
+        if archive.getinfo(name).file_size > limit:
+            return f'{name} — тым үлкен (мах {limit // (1024 * 1024)} MB)'
+        with archive.open(name) as entry:
+            try:
+                verify_image(entry)
+            except ImageRejected as exc:
+                return f'{name} — {exc}'
+    return None
+
+
+def _image_field():
+    return ProductImage._meta.get_field('image')
+
+
+def _save_image(archive, name):
+    """ZIP жазбасын storage-қа ағым менен көшириў; сақланған атын қайтарады."""
+    field = _image_field()
+    target = field.generate_filename(None, posixpath.basename(name))
+    with archive.open(name) as entry:
+        return field.storage.save(target, File(entry), max_length=field.max_length)
+
+
+def _delete_images(paths):
+    storage = _image_field().storage
+    for path in paths:
+        try:
+            storage.delete(path)
+        except OSError:
+            pass
+
+
+def _write_batch(batch, archive, report):
+    """Бир топтамды бир транзакцияда жазыў: 3 bulk INSERT.
+
+    Суретлер транзакциядан бурын, қатар-қатар storage-қа жазылады — ZIP
+    ашыў ҳәм дискке жазыў SQLite write-lock-ты услап турмайды; жадта бир
+    ўақытта тек бир ZIP жазбасының буфери турады. Транзакция сәтсиз
+    болса сақланған файллар өширилип, қәте жоқарыға жибериледи.
+    """
+    saved, paths = [], []
+    try:
+        for _, _, _, image_names in batch:
+            row_paths = []
+            for name in image_names:
+                row_paths.append(_save_image(archive, name))
+                saved.append(row_paths[-1])
+            paths.append(row_paths)
+
+        with transaction.atomic():
+            products = Product.objects.bulk_create([product for _, product, _, _ in batch])
+            sizes, images = [], []
+            for product, (_, _, wanted, _), row_paths in zip(products, batch, paths):
+                sizes.extend(
+                    ProductSize(product=product, size=size, quantity=qty)
+                    for size, qty in wanted.items()
+                )
+                images.extend(
+                    ProductImage(product=product, image=path, order=i)
+                    for i, path in enumerate(row_paths)
+                )
+            ProductSize.objects.bulk_create(sizes)
+            ProductImage.objects.bulk_create(images)
+            refresh_product_stock(product.pk for product in products)
+            transaction.on_commit(bump_catalog_version)
+    except BaseException:
+        # nothing references these files once the batch is rolled back
+        _delete_images(saved)
+        raise
+    report.created += len(products)
+
+
+def _import_row(line_no, row, seller, members, archive, batch, report):
+    """Бир қатарды тексерип, дурыс болса ``batch``-қа қосыў."""
+    if isinstance(row, Exception):
+        report.error(line_no, str(row))
+        return
+
+    form = ProductForm({
+        key: row.get(key) or Product._meta.get_field(key).get_default()
+        for key in ProductForm.Meta.fields
+    })
+    if not form.is_valid():
+        message = '; '.join(
+            f'{field}: {" ".join(errors)}' for field, errors in form.errors.items()
+        )
+        report.error(line_no, message)
+        return
+
+    image_names = _split_images(row.get('images'))[:MAX_PRODUCT_IMAGES]
+    missing = [name for name in image_names if name not in members]
+    if missing:
+        report.error(line_no, f'images: ZIP-те жоқ — {", ".join(missing)}')
+        return
+    problem = _check_images(archive, image_names) if image_names else None
+    if problem:
+        report.error(line_no, f'images: {problem}')
+        return
+
+    product = form.save(commit=False)
+    product.seller = seller
+    wanted = parse_sizes(*_split_sizes(row.get('sizes')))
+    batch.append((line_no, product, wanted, image_names))
+
+
+def import_catalog(seller, stream, fmt='csv', images_zip=None, batch_size=200):
+    report = ImportReport()
+    archive = zipfile.ZipFile(images_zip) if images_zip is not None else None
+    members = set(archive.namelist()) if archive else set()
+    batch = []
+    try:
+        try:
+            for line_no, row in iter_rows(stream, fmt):
+                _import_row(line_no, row, seller, members, archive, batch, report)
+                if len(batch) >= batch_size:
+                    _write_batch(batch, archive, report)
+                    batch = []
+        except FILE_ERRORS as exc:
+            # rows read before the error are still imported
+            report.file_error = _file_error(exc)
+        if batch:
+            _write_batch(batch, archive, report)
+    finally:
+        if archive:
+            archive.close()
+    return report
+
+
+class Echo:
+    """csv.writer ушын буфер: жазылған қатарды сақламай қайтарады."""
+
+    def write(self, value):
+        return value
+
+
+def _iter_product_chunks(seller, chunk_size):
+    """Өнимлерди pk бойынша keyset бөлимлерге бөлип оқыў."""
+    last_pk = 0
+    while True:
+        chunk = list(
+            Product.objects.filter(seller=seller, is_active=True, pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'name', 'category', 'price', 'gender', 'style', 'description')[:chunk_size]
+        )
+        if not chunk:
+            return
+        pks = [row[0] for row in chunk]
+        sizes, images = {}, {}
+        for product_id, size, qty in ProductSize.objects.filter(product_id__in=pks).values_list(
+                'product_id', 'size', 'quantity'):
+            sizes.setdefault(product_id, []).append(f'{size}:{qty}')
+        for product_id, name in ProductImage.objects.filter(product_id__in=pks).order_by(
+                'order').values_list('product_id', 'image'):
+            images.setdefault(product_id, []).append(posixpath.basename(name))
+        for pk, *fields in chunk:
+            yield fields + [';'.join(sizes.get(pk, [])), ';'.join(images.get(pk, []))]
+        last_pk = pks[-1]
+
+
+def stream_catalog_csv(seller, chunk_size=500):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CATALOG_FIELDS)
+    for row in _iter_product_chunks(seller, chunk_size):
+        yield writer.writerow(row)
+
+
+def stream_orders_csv(seller, chunk_size=2000):
+    writer = csv.writer(Echo())
+    yield writer.writerow(ORDER_FIELDS)
+    rows = OrderItem.objects.filter(product__seller=seller).order_by('-order__created_at', 'pk').values_list(
+        'order_id', 'order__created_at', 'order__status', 'order__user__username',
+        'product_id', 'product__name', 'size', 'quantity', 'price',
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
+    # archived orders are older than every live one, so the order stays newest-first
+    archived = ArchivedOrderItem.objects.filter(seller=seller).order_by('-order__created_at', 'pk').values_list(
+        'order_id', 'order__created_at', 'order__status', 'order__user__username',
+        'product_id', 'product_name', 'size', 'quantity', 'price',
+    )
+    for row in archived.iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
@@ -0,0 +1,110 @@
+"""Каталог беттери ушын conditional GET (ETag / Last-Modified).
+
+ETag ауыр сораўлардан бурын тек кэштеги версиялардан есапланады:
+каталог (яки өним) версиясы + пайдаланыўшы варианты. Мағлыўмат
+өзгермесе view шақырылмайды ҳәм 304 қайтарылады.
+
+Аноним жуўаплар ``X-Accel-Expires`` алады — nginx оларды қысқа
+ўақытқа (micro-cache) сақлайды. Себет саны сыяқлы жеке бөлеклер
+денеге кирмейди (``cart_count`` endpoint арқалы JS толтырады).
+
+Есаплағыш бағаналары (``views_count``, ``trending_score``) бойынша
+сортланған дизимлер версия жаңаланбай-ақ өзгереди; ``version_func``
+оларға ``None`` қайтарады ҳәм бет шәртсиз рендерленеди.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .db_router import primary_unless_covered
+from .product_cache import get_catalog_version, get_version
+from .services import COUNTER_FIELDS, SORTS
+
+
+def _user_variant(request):
+    user = request.user
+    if not user.is_authenticated:
+        return 'anon'
+    # the rendered page embeds the user's name/size and a CSRF token
+    return '|'.join(str(part) for part in (
+        user.pk, user.role, user.first_name, user.shop_name, user.size,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+
+
+def catalog_page(version_func, on_get=None):
+    """``version_func(request, *args, **kwargs)`` — ns-тағы версия стампы
+    яки ``None`` (шәртли жуўап жоқ).
+
+    ETag = hash(view, URL, версия, пайдаланыўшы), Last-Modified = версия.
+    ``on_get`` тек GET-те, 304 жуўапта да орынланады (мысалы, көриўлер
+    есаплағышы); HEAD оны шақырмайды.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            if on_get is not None and request.method == 'GET':
+                # HEAD probes (monitoring, link checkers) are not views
+                on_get(request, *args, **kwargs)
+            request.cacheable_page = True
+            if len(get_messages(request)):
+                # pending flash messages must be rendered, never a stale 304
+                return view_func(request, *args, **kwargs)
+
+            version = version_func(request, *args, **kwargs)
+            if version is None:
+                return view_func(request, *args, **kwargs)
+            raw = f'{view_func.__name__}:{request.get_full_path()}:{version}:{_user_variant(request)}'
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+            last_modified = version // 10**9
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                # the body is tagged with this version, so it must not come from an older read copy
+                with primary_unless_covered(version):
+                    response = view_func(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+                _cache_headers(request, response)
+            return response
+        return wrapper
+    return decorator
+
+
+def _cache_headers(request, response):
+    patch_vary_headers(response, ['Cookie'])
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        return
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    seconds = getattr(settings, 'CATALOG_MICROCACHE_SECONDS', 0)
+    if seconds:
+        response['X-Accel-Expires'] = str(seconds)
+
+
+def catalog_version(request, *args, **kwargs):
+    return get_catalog_version()
+
+
+def catalog_list_version(request, *args, **kwargs):
+    """``catalog_version``, бирақ есаплағыш бойынша сортта ``None``.
+
+    HTML дизими ``?sort=`` бағана атын, API болса ``SORTS`` гилтин алады.
+    """
+    sort = request.GET.get('sort') or ''
+    column = SORTS[sort][0] if sort in SORTS else sort.lstrip('-')
+    if column in COUNTER_FIELDS:
+        # counters change without a version bump
+        return None
+    return get_catalog_version()
+
+
+def product_version(request, pk, *args, **kwargs):
+    return get_version(pk)
@@ -1,5 +1,11 @@
+from functools import lru_cache
+
+
 def cart_count(request):
-    count = 0
-    if request.user.is_authenticated and hasattr(request.user, 'role') and request.user.role == 'client':
-        count = request.user.cart_items.count()
+    # lazy: catalog pages render the badge client-side and never run the query
+    @lru_cache(maxsize=None)
+    def count():
+        if request.user.is_authenticated and hasattr(request.user, 'role') and request.user.role == 'client':
+            return request.user.cart_items.count()
+        return 0
     return {'cart_count': count}
@@ -0,0 +1,190 @@
+"""Каталог оқыўларын ``read`` базасына, жазыўларды ``default``-қа бағдарлаў.
+
+``DATABASES``-те ``read`` алиасы болмаса роутер ҳеш нәрсе өзгертпейди.
+Болса ``DB_READ_MODELS`` моделлериниң оқыўлары реплика/снапшотқа кетеди,
+төмендеги жағдайлардан басқа:
+
+* сораў POST/PUT/... (unsafe) — барлығы ``default``-тан;
+* усы сораўда (яки процессте) бир нәрсе жазылған — sticky;
+* сессияда ``DB_STICKY_SECONDS`` ишинде жазыў болған — пайдаланыўшы
+  өз өзгерислерин реплика кешиккен болса да көреди (сессия тек session
+  cookie болса оқылады);
+* ``default``-та ашық транзакция бар.
+
+Есаплағыш жаңалаўлары (мысалы, ``views_count``) ``ignore_writes()``
+ишинде орынланып, sticky жағдайын қоспайды.
+
+Версия гилтли кэшлер (өним снапшоты, каталог беттериниң ETag-ы,
+autocomplete индекси) ``read_covers(version)`` жалған болса — яғный
+``read`` көширмеси версия жаңаланғаннан бурын алынған болса —
+``use_primary()`` ишинде ``default``-тан қурылады. Әйтпесе ески
+мағлыўмат жаңа версия гилти астында сақланып қалар еди.
+
+SQLite снапшоты ``os.replace`` пенен алмастырылады; ески файлды ашқан
+байланыс оны көре береди. ``CONN_MAX_AGE = 0`` болғанда байланыс ҳәр
+сораўдан кейин жабылады, ал узақ жасайтуғын байланысты middleware
+сораў басында файл алмасқанын (inode) тексерип жабады.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+READ_ALIAS = 'read'
+SESSION_KEY = '_db_sticky_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class _State:
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.wrote = False
+        self.ignoring = 0
+
+
+_current = ContextVar('kiyim_db_state', default=None)
+
+
+def _state():
+    state = _current.get()
+    if state is None:
+        state = _State()
+        _current.set(state)
+    return state
+
+
+def read_enabled():
+    return READ_ALIAS in connections.databases
+
+
+def read_synced_at():
+    """``read`` көширмеси қай ўақытқа шекемги (ns) жазыўларды өз ишине алады.
+
+    SQLite снапшотында — файлдың mtime (``snapshot_read_db`` оны көшириў
+    басланған ўақытқа қояды); репликада — ``DB_READ_MAX_LAG_SECONDS``
+    бойынша баҳа. ``read`` жоқ болса ``None``.
+    """
+    if not read_enabled():
+        return None
+    database = connections.databases[READ_ALIAS]
+    if 'sqlite3' in database['ENGINE']:
+        try:
+            return os.stat(database['NAME']).st_mtime_ns
+        except OSError:
+            return 0
+    return time.time_ns() - int(settings.DB_READ_MAX_LAG_SECONDS * 10**9)
+
+
+def _snapshot_inode():
+    try:
+        return os.stat(connections.databases[READ_ALIAS]['NAME']).st_ino
+    except OSError:
+        return None
+
+
+@receiver(connection_created)
+def _remember_snapshot(sender, connection, **kwargs):
+    if connection.alias == READ_ALIAS and connection.vendor == 'sqlite':
+        connection.snapshot_inode = _snapshot_inode()
+
+
+def close_replaced_snapshot():
+    """``read`` байланысы алмастырылған ески снапшот файлын тутып турса жабыў."""
+    connection = connections[READ_ALIAS]
+    if connection.vendor != 'sqlite' or connection.connection is None:
+        return
+    if getattr(connection, 'snapshot_inode', None) != _snapshot_inode():
+        connection.close()
+
+
+def read_covers(version):
+    """``read``-тан оқылған мағлыўмат ``version`` (ns) версиясын толық көрсете ме."""
+    synced_at = read_synced_at()
+    return synced_at is None or synced_at >= version
+
+
+@contextmanager
+def ignore_writes():
+    """Ишиндеги жазыўлар оқыўларды ``default``-қа бекитпейди."""
+    state = _state()
+    state.ignoring += 1
+    try:
+        yield
+    finally:
+        state.ignoring -= 1
+
+
+@contextmanager
+def use_primary():
+    """Ишиндеги барлық оқыўлар ``default``-тан."""
+    state = _state()
+    sticky, state.sticky = state.sticky, True
+    try:
+        yield
+    finally:
+        # a write inside the block keeps the request sticky
+        state.sticky = sticky or state.wrote
+
+
+@contextmanager
+def primary_unless_covered(version):
+    """``version`` ушын кэшленетуғын мағлыўматты қурыў: ``read`` артта қалса ``default``-тан."""
+    if read_covers(version):
+        yield
+    else:
+        with use_primary():
+            yield
+
+
+class ReadWriteRouter:
+    def db_for_read(self, model, **hints):
+        if not read_enabled() or model._meta.label_lower not in settings.DB_READ_MODELS:
+            return None
+        if _state().sticky or connections['default'].in_atomic_block:
+            return 'default'
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state()
+        if not state.ignoring and model._meta.label_lower not in settings.DB_UNTRACKED_WRITE_MODELS:
+            state.sticky = state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != READ_ALIAS
+
+
+class StickyWritesMiddleware:
+    """Сораў ушын роутер жағдайын орнатыў ҳәм жазыўдан кейин сессияны белгилеў."""
+
+    def __init__(self, get_response):
+        if not read_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        close_replaced_snapshot()
+        session = getattr(request, 'session', None)
+        # no session cookie -> nothing sticky to read; don't load the session
+        # for anonymous catalog traffic
+        has_session = session is not None and settings.SESSION_COOKIE_NAME in request.COOKIES
+        until = session.get(SESSION_KEY, 0) if has_session else 0
+        state = _State(sticky=request.method not in SAFE_METHODS or until > time.time())
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+            if state.wrote and session is not None:
+                session[SESSION_KEY] = time.time() + settings.DB_STICKY_SECONDS
+        finally:
+            _current.reset(token)
+        return response
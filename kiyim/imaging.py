@@ -0,0 +1,81 @@
+import io
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+
+class ImageRejected(ValueError):
+    """Жүкленген файл сурет емес яки тым үлкен."""
+
+
+def _limits():
+    width, height = getattr(settings, 'TRYON_INPUT_SIZE', (768, 1024))
+    max_pixels = getattr(settings, 'TRYON_MAX_INPUT_PIXELS', 40_000_000)
+    return (width, height), max_pixels
+
+
+def verify_image(source, max_pixels=None):
+    """Файл ҳақыйқый сурет екенин декодсыз тексериў; форматын қайтарады.
+
+    Header ҳәм пиксел саны тексериледи, ``Image.verify()`` файлдың
+    структурасын оқып шығады. Қәте болса ``ImageRejected``.
+    """
+    if max_pixels is None:
+        max_pixels = _limits()[1]
+    try:
+        with Image.open(source) as img:
+            if img.width * img.height > max_pixels:
+                raise ImageRejected('Сурет тым үлкен')
+            img.verify()
+            return img.format
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ImageRejected('Файл сурет емес') from exc
+
+
+def prepare_tryon_image(source, quality=90):
+    """Суретти IDM-VTON кириў өлшемине келтириў.
+
+    ``source`` — жол яки файл объекти (Django UploadedFile, temp файл).
+    Сурет толық оқылмай, алдын header тексериледи; JPEG ушын ``draft``
+    арқалы киширейтилген масштабта декод етиледи, сонда жадта тек
+    кишкене буфер турады. Қайтарылатуғын мәни — ``(BytesIO, meta)``.
+    """
+    target, max_pixels = _limits()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    try:
+        img = Image.open(source)
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ImageRejected('Файл сурет емес') from exc
+
+    with img:
+        src_w, src_h = img.size
+        if src_w * src_h > max_pixels:
+            raise ImageRejected('Сурет тым үлкен')
+        src_format = img.format
+
+        # JPEG decoder can scale by 1/2, 1/4, 1/8 while decoding
+        if src_format == 'JPEG':
+            img.draft('RGB', target)
+
+        try:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            img.thumbnail(target, Image.LANCZOS)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+        except (OSError, Image.DecompressionBombError) as exc:
+            raise ImageRejected('Суретти оқыў мүмкин емес') from exc
+
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=quality, optimize=True)
+
+    out.seek(0)
+    return out, {
+        'source_size': (src_w, src_h),
+        'source_format': src_format,
+        'size': img.size,
+        'bytes': out.getbuffer().nbytes,
+    }
@@ -0,0 +1,46 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from kiyim.autocomplete import PrefixIndex, normalize
+
+
+class Command(BaseCommand):
+    help = 'Autocomplete индексин қурып, prefix излеўдиң кешигиўин өлшеў'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=5000, help='Өлшенетуғын сораўлар саны')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        index = PrefixIndex()
+        t0 = time.perf_counter()
+        index.refresh(force=True)
+        build_ms = (time.perf_counter() - t0) * 1000
+        self.stdout.write(
+            f'индекс: {len(index.keys)} гилт, {len(index.entries)} жазба, '
+            f'~{index.bytes / 1024 / 1024:.1f} MB, қурылыў {build_ms:.1f} ms'
+        )
+        if not index.keys:
+            return
+
+        rng = random.Random(options['seed'])
+        labels = [label for label, _ in index.entries.values()]
+        prefixes = []
+        for _ in range(options['queries']):
+            word = normalize(rng.choice(labels))
+            prefixes.append(word[:rng.randint(1, max(min(len(word), 6), 1))])
+
+        timings = []
+        for prefix in prefixes:
+            t0 = time.perf_counter()
+            index.search(prefix)
+            timings.append((time.perf_counter() - t0) * 1_000_000)
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        self.stdout.write(
+            f'{len(timings)} сораў: p50 {statistics.median(timings):.1f} µs, '
+            f'p99 {p99:.1f} µs, max {timings[-1]:.1f} µs'
+        )
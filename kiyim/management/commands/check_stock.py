@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from kiyim.db_router import use_primary
+from kiyim.models import Product
+from kiyim.services import compute_stock, refresh_product_stock
+
+
+class Command(BaseCommand):
+    help = 'Product.size_mask/total_stock мәнислерин ProductSize пенен салыстырыў'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Сәйкес келмегенлерин дүзетиў')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # compare against the primary, never a lagging read copy
+        with use_primary():
+            self._check(options)
+
+    def _check(self, options):
+        chunk_size = options['chunk_size']
+        checked, mismatched, last_pk = 0, [], 0
+        while True:
+            chunk = list(
+                Product.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'size_mask', 'total_stock')[:chunk_size]
+            )
+            if not chunk:
+                break
+            stock = compute_stock([pk for pk, _, _ in chunk])
+            for pk, mask, total in chunk:
+                expected = stock.get(pk, (0, 0))
+                if (mask, total) != expected:
+                    mismatched.append(pk)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f'#{pk}: size_mask {mask} != {expected[0]}, total_stock {total} != {expected[1]}')
+            checked += len(chunk)
+            last_pk = chunk[-1][0]
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS(f'{checked} өним тексерилди, ҳәммеси сәйкес'))
+            return
+        if options['fix']:
+            for i in range(0, len(mismatched), chunk_size):
+                refresh_product_stock(mismatched[i:i + chunk_size])
+            self.stdout.write(self.style.SUCCESS(f'{checked} өним тексерилди, {len(mismatched)} дүзетилди'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'{checked} өним тексерилди, {len(mismatched)} сәйкес емес (дүзетиў ушын --fix)'
+            ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from kiyim.trending import update_trending
+
+
+class Command(BaseCommand):
+    help = 'Өнимлердиң trending баллын қайта есаплаў (cron/systemd timer арқалы)'
+
+    def handle(self, *args, **options):
+        scored, pruned = update_trending()
+        self.stdout.write(self.style.SUCCESS(f'{scored} өним бағаланды, {pruned} ески бакет өширилди'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kiyim.catalog_io import import_catalog
+from kiyim.models import User
+
+
+class Command(BaseCommand):
+    help = 'Сатыўшы каталогын CSV/JSONL файлдан (ҳәм суретлер ZIP-тен) импорт етиў'
+
+    def add_arguments(self, parser):
+        parser.add_argument('seller', help='Сатыўшының username-и')
+        parser.add_argument('path', help='.csv яки .jsonl файл')
+        parser.add_argument('--images', help='Суретлер ZIP архиви')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Файл форматы (кеңейтпеден анықланады)')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        try:
+            seller = User.objects.get(username=options['seller'], role='seller')
+        except User.DoesNotExist:
+            raise CommandError(f"Сатыўшы табылмады: {options['seller']}")
+
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv')
+
+        with open(path, 'rb') as stream:
+            if options['images']:
+                with open(options['images'], 'rb') as images_zip:
+                    report = import_catalog(seller, stream, fmt, images_zip, options['batch_size'])
+            else:
+                report = import_catalog(seller, stream, fmt, None, options['batch_size'])
+
+        if report.file_error:
+            self.stderr.write(report.file_error)
+        for line, message in report.errors:
+            self.stderr.write(f'{line}: {message}')
+        if report.failed > len(report.errors):
+            self.stderr.write(f'... ҳәм тағы {report.failed - len(report.errors)} қәте')
+        self.stdout.write(self.style.SUCCESS(f'{report.created} өним қосылды, {report.failed} қәте'))
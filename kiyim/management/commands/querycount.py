@@ -0,0 +1,41 @@
+import contextlib
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from kiyim.models import User
+
+
+class Command(BaseCommand):
+    help = 'Ҳәр бет ушын SQL сораўлар санын өлшеў (кирген пайдаланыўшы менен)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--user', help='Username; берилмесе аноним')
+        parser.add_argument('--repeat', type=int, default=3)
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        client = Client()
+        if options['user']:
+            try:
+                client.force_login(User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"Пайдаланыўшы табылмады: {options['user']}")
+
+        for url in options['urls']:
+            counts = []
+            for _ in range(options['repeat']):
+                with contextlib.ExitStack() as stack:
+                    # every alias, so reads routed to a replica are counted too
+                    contexts = [stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()]
+                    response = client.get(url)
+                queries = [query for context in contexts for query in context.captured_queries]
+                counts.append(len(queries))
+            counts_str = ' '.join(str(n) for n in counts)
+            self.stdout.write(f'{url:<30} {response.status_code}  queries: {counts_str}')
+            if options['verbosity'] > 1:
+                for query in queries:
+                    self.stdout.write(f"    {query['sql'][:120]}")
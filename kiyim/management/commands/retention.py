@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from kiyim.retention import archive_orders, purge_carts
+
+
+class Command(BaseCommand):
+    help = 'Ески себетлерди өшириў ҳәм суўық буйрытмаларды архивке көшириў (systemd timer арқалы)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-carts', action='store_true', help='Себетлерди тазаламаў')
+        parser.add_argument('--skip-orders', action='store_true', help='Буйрытмаларды архивлемеў')
+        parser.add_argument('--batch-size', type=int, default=None, help='Бир транзакциядағы қатарлар саны')
+        parser.add_argument('--pause', type=float, default=None, help='Топтамлар арасындағы тыным (секунд)')
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Бир иске түсириўде ең көп топтам; қалғаны келеси сапар даўам етеди',
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'batch_size': options['batch_size'],
+            'pause': options['pause'],
+            'max_batches': options['max_batches'],
+        }
+        if not options['skip_carts']:
+            deleted = purge_carts(**kwargs)
+            self.stdout.write(self.style.SUCCESS(f'{deleted} ески себет қатары өширилди'))
+        if not options['skip_orders']:
+            archived = archive_orders(**kwargs)
+            self.stdout.write(self.style.SUCCESS(f'{archived} буйрытма архивке көширилди'))
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from kiyim.db_router import READ_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'SQLite ``default`` базасынан ``read`` алиасы ушын снапшот жасаў (systemd timer арқалы)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024, help='Backup API бир қадамда көширетуғын беттер')
+
+    def handle(self, *args, **options):
+        if READ_ALIAS not in connections.databases:
+            raise CommandError(f'DATABASES ишинде "{READ_ALIAS}" алиасы жоқ')
+        source = connections.databases['default']
+        target = connections.databases[READ_ALIAS]
+        if 'sqlite3' not in source['ENGINE'] or 'sqlite3' not in target['ENGINE']:
+            raise CommandError('Снапшот тек SQLite ушын; PostgreSQL репликасы өзи жаңаланады')
+
+        target_path = str(target['NAME'])
+        tmp_path = f'{target_path}.tmp'
+        started = time.monotonic()
+        started_ns = time.time_ns()
+        # online backup: writers are not blocked for the whole copy
+        src = sqlite3.connect(str(source['NAME']))
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst, pages=options['pages'])
+        finally:
+            dst.close()
+            src.close()
+        # mtime = copy start: db_router.read_covers() compares cache versions with it
+        os.utime(tmp_path, ns=(started_ns, started_ns))
+        # other workers reconnect after the request (CONN_MAX_AGE = 0) or
+        # at the next one (db_router.close_replaced_snapshot)
+        os.replace(tmp_path, target_path)
+        connections[READ_ALIAS].close()
+        self.stdout.write(self.style.SUCCESS(
+            f'{target_path} жаңаланды ({time.monotonic() - started:.2f} с)'
+        ))
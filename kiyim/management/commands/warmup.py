@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from kiyim.warmup import warmup
+
+BENCHMARK_URLS = ['home', 'product_list', 'api_products', 'login', 'register_choice']
+
+
+class Command(BaseCommand):
+    help = 'Шаблонларды компиляциялаў, URL-лерди resolve етиў ҳәм кэшлерди қыздырыў'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Ашық бетлерге биринши ҳәм екинши сораўдың ўақытын өлшеў',
+        )
+        parser.add_argument(
+            '--no-warmup', action='store_true',
+            help='Салыстырыў ушын қыздырмастан өлшеў (--benchmark пенен)',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='req/s есаплаў ушын ҳәр бетке неше сораў (--benchmark пенен)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['no_warmup']:
+            for step, (ms, result) in warmup().items():
+                suffix = f' ({result})' if result is not None else ''
+                self.stdout.write(f'{step:<20} {ms:8.1f} ms{suffix}')
+
+        if options['benchmark']:
+            self._benchmark(options['repeat'])
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def _benchmark(self, repeat):
+        client = Client()
+        self.stdout.write(f'{"url":<20} {"first":>10} {"second":>10} {"req/s":>8}')
+        for name in BENCHMARK_URLS:
+            url = reverse(name)
+            timings = []
+            for _ in range(2):
+                t0 = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                client.get(url)
+            rps = repeat / (time.perf_counter() - t0) if repeat > 0 else 0
+            self.stdout.write(f'{url:<20} {timings[0]:8.1f}ms {timings[1]:8.1f}ms {rps:8.1f}')
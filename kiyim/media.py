@@ -0,0 +1,159 @@
+"""Медиа файлларды бериў: ашық файллар nginx-тен, жабықлары рухсат пенен.
+
+``PRIVATE_MEDIA_PREFIXES`` ишиндеги жоллар (аватарлар, try-on файллары)
+тек ийесине ҳәм staff-қа көринеди. Django тек рухсатты тексереди, ал
+байтларды ``MEDIA_SERVE_MODE`` бойынша веб-сервер жибереди:
+
+* ``nginx`` — ``X-Accel-Redirect: <MEDIA_ACCEL_PREFIX><path>`` (internal location);
+* ``sendfile`` — ``X-Sendfile: <абсолют жол>`` (Apache/lighttpd);
+* ``django`` — ``FileResponse``, ``Range`` ҳәм ``If-Modified-Since`` пенен (локал dev).
+
+Ашық медиа продакшнда Django-ға келмейди; ``DEBUG`` яки
+``SERVE_MEDIA_WITH_DJANGO`` болғанда ғана усы view арқалы бериледи.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .models import User
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _can_view_avatar(user, path):
+    return User.objects.filter(pk=user.pk, avatar=path).exists()
+
+
+def _can_view_tryon(user, path):
+    # layout: tryon/<user_pk>/<file>
+    parts = path.split('/')
+    return len(parts) > 2 and parts[1] == str(user.pk)
+
+
+# prefix -> owner check; staff may read everything
+ACCESS_RULES = {
+    'avatars/': _can_view_avatar,
+    'tryon/': _can_view_tryon,
+}
+
+
+def private_prefix(path):
+    for prefix in settings.PRIVATE_MEDIA_PREFIXES:
+        if path.startswith(prefix):
+            return prefix
+    return None
+
+
+def can_view(user, path):
+    prefix = private_prefix(path)
+    if prefix is None:
+        return True
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    check = ACCESS_RULES.get(prefix)
+    return bool(check and check(user, path))
+
+
+def _content_type(path):
+    content_type, encoding = mimetypes.guess_type(path)
+    return content_type or 'application/octet-stream', encoding
+
+
+def _iter_range(full_path, start, length):
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, full_path, stat):
+    """Локал dev ушын: 304, бир ``Range`` бөлими (206/416) яки толық файл."""
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+    content_type, encoding = _content_type(full_path)
+    size = stat.st_size
+
+    match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+    if match and (match.group(1) or match.group(2)):
+        first, last = match.groups()
+        if first:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+        if start >= size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        response = StreamingHttpResponse(
+            _iter_range(full_path, start, end - start + 1), status=206, content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def offload_response(path, full_path):
+    """Байтларсыз жуўап: файлды веб-сервер өзи жибереди."""
+    content_type, _ = _content_type(full_path)
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_SERVE_MODE == 'sendfile':
+        response['X-Sendfile'] = full_path
+    else:
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+    return response
+
+
+def serve(request, path):
+    # normalize first so "products/../avatars/x" can't skip the private check
+    path = posixpath.normpath(path.replace('\\', '/')).lstrip('/')
+    if path == '.' or path.startswith('../') or path == '..':
+        raise Http404
+    prefix = private_prefix(path)
+    if prefix is None and not (settings.DEBUG or getattr(settings, 'SERVE_MEDIA_WITH_DJANGO', False)):
+        raise Http404
+    if not can_view(request.user, path):
+        # same answer as a missing file, so private names can't be probed
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    if settings.MEDIA_SERVE_MODE in ('nginx', 'sendfile'):
+        response = offload_response(path, full_path)
+    else:
+        response = file_response(request, full_path, stat)
+    if prefix is None:
+        response['Cache-Control'] = 'public, max-age=2592000'
+    else:
+        response['Cache-Control'] = 'private, max-age=3600'
+        response['Vary'] = 'Cookie'
+    return response
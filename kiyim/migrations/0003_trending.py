@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiyim', '0002_order_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.IntegerField(help_text='Unix epoch саатлары')),
+                ('views', models.IntegerField(default=0)),
+                ('cart_adds', models.IntegerField(default=0)),
+                ('purchases', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', '-trending_score'], name='product_trending_idx'),
+        ),
+        migrations.AddField(
+            model_name='productactivity',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='kiyim.product'),
+        ),
+        migrations.AddIndex(
+            model_name='productactivity',
+            index=models.Index(fields=['bucket'], name='activity_bucket_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productactivity',
+            unique_together={('product', 'bucket')},
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiyim', '0003_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Күтилмекте'), ('accepted', 'Қабыл алынды'), ('shipped', 'Жолда'), ('delivered', 'Жеткерилди'), ('cancelled', 'Бас тартылды')], max_length=20)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('address', models.TextField(blank=True)),
+                ('items', models.JSONField(default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['added_at'], name='cart_added_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['user', '-created_at'], name='archived_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:13
+
+from django.db import migrations, models
+
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL']
+
+
+def backfill_stock(apps, schema_editor):
+    Product = apps.get_model('kiyim', 'Product')
+    ProductSize = apps.get_model('kiyim', 'ProductSize')
+    stock = {}
+    for product_id, size, quantity in ProductSize.objects.filter(quantity__gt=0).values_list(
+            'product_id', 'size', 'quantity').iterator():
+        mask, total = stock.get(product_id, (0, 0))
+        bit = 1 << SIZES.index(size) if size in SIZES else 0
+        stock[product_id] = (mask | bit, total + quantity)
+    Product.objects.bulk_update(
+        [Product(pk=pk, size_mask=mask, total_stock=total) for pk, (mask, total) in stock.items()],
+        ['size_mask', 'total_stock'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiyim', '0004_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='size_mask',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='total_stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'size_mask'], name='product_size_mask_idx'),
+        ),
+        migrations.RunPython(backfill_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_sales(apps, schema_editor):
+    """Бурын архивленген буйрытмалардың JSON позицияларынан сатыўшы қатарлары.
+
+    Сатыўшы өнимнен анықланады; өним өширилген болса қатар тасланады.
+    """
+    ArchivedOrder = apps.get_model('kiyim', 'ArchivedOrder')
+    ArchivedOrderItem = apps.get_model('kiyim', 'ArchivedOrderItem')
+    Product = apps.get_model('kiyim', 'Product')
+    last_pk = 0
+    while True:
+        orders = list(ArchivedOrder.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'items')[:500])
+        if not orders:
+            return
+        product_ids = {item[0] for _, items in orders for item in items}
+        sellers = dict(Product.objects.filter(pk__in=product_ids).values_list('pk', 'seller_id'))
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(
+                order_id=order_id, seller_id=sellers[product_id], product_id=product_id, product_name=name,
+                size=size, quantity=quantity, price=price,
+            )
+            for order_id, items in orders
+            for product_id, name, shop_name, size, quantity, price in items
+            if product_id in sellers
+        ])
+        last_pk = orders[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kiyim', '0006_ratelimit_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='id',
+            field=models.BigIntegerField(primary_key=True, serialize=False),
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField()),
+                ('product_name', models.CharField(max_length=200)),
+                ('size', models.CharField(max_length=5)),
+                ('quantity', models.IntegerField(default=1)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sale_items', to='kiyim.archivedorder')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_sales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['seller', 'order'], name='archived_item_seller_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_sales, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -48,6 +50,16 @@ STYLE_CHOICES = [
 
 GENDER_PRODUCT = [('male','Еркек'),('female','Аял'),('unisex','Унисекс')]
 SIZE_CHOICES = [('XS','XS'),('S','S'),('M','M'),('L','L'),('XL','XL'),('XXL','XXL'),('XXXL','XXXL')]
+# Product.size_mask биттери: XS=1, S=2, M=4, ...
+SIZE_BITS = {size: 1 << i for i, (size, _) in enumerate(SIZE_CHOICES)}
+
+
+def size_mask(sizes):
+    """Размерлер дизиминен bitmask (белгисизлери есапқа алынбайды)."""
+    mask = 0
+    for size in sizes:
+        mask |= SIZE_BITS.get(size, 0)
+    return mask
 
 
 class Product(models.Model):
@@ -61,6 +73,20 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     views_count = models.IntegerField(default=0)
+    trending_score = models.FloatField(default=0)
+    # ProductSize-тан есапланады: қолда бар размерлер биттери ҳәм жалпы қалдық
+    size_mask = models.PositiveIntegerField(default=0)
+    total_stock = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', '-trending_score'], name='product_trending_idx'),
+            models.Index(fields=['is_active', 'size_mask'], name='product_size_mask_idx'),
+            # admin filters (alone) and catalog filters (with is_active)
+            models.Index(fields=['category', 'is_active'], name='product_category_idx'),
+            models.Index(fields=['gender', 'is_active'], name='product_gender_idx'),
+            models.Index(fields=['style', 'is_active'], name='product_style_idx'),
+        ]
 
     def main_image(self):
         img = self.images.first()
@@ -91,6 +117,19 @@ class ProductSize(models.Model):
         unique_together = ['product', 'size']
 
 
+class ProductActivity(models.Model):
+    """Өним белсендилиги — саатлық бакетлерге бөлинген есаплағышлар."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='activity')
+    bucket = models.IntegerField(help_text='Unix epoch саатлары')
+    views = models.IntegerField(default=0)
+    cart_adds = models.IntegerField(default=0)
+    purchases = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['product', 'bucket']
+        indexes = [models.Index(fields=['bucket'], name='activity_bucket_idx')]
+
+
 class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart_items')
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -98,6 +137,9 @@ class Cart(models.Model):
     quantity = models.IntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['added_at'], name='cart_added_idx')]
+
     def total(self):
         return self.product.price * self.quantity
 
@@ -116,6 +158,67 @@ class Order(models.Model):
     total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     address = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """Архивке көширилген ески буйрытма: позициялар бир JSON қатарында.
+
+    ``id`` дәслепки ``Order.pk`` пенен бирдей, сонда сылтамалар өзгермейди.
+    ``items`` — ``[product_id, өним аты, дүкан, размер, саны, баҳа]`` дизими
+    (клиент тарийхы ушын); сатыўшы есаплары ``ArchivedOrderItem``-тен.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders')
+    created_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    address = models.TextField(blank=True)
+    items = models.JSONField(default=list)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-created_at'], name='archived_user_created_idx')]
+
+    def item_rows(self):
+        rows = []
+        for product_id, name, shop_name, size, quantity, price in self.items:
+            price = Decimal(price)
+            rows.append({
+                'product': {'pk': product_id, 'name': name, 'seller': {'shop_name': shop_name}},
+                'size': size,
+                'quantity': quantity,
+                'price': price,
+                'subtotal': price * quantity,
+            })
+        return rows
+
+
+class ArchivedOrderItem(models.Model):
+    """Архивленген буйрытманың сатыўшы қатары: дашборд табысы ҳәм CSV экспорт ушын.
+
+    Өним кейин өширилсе де қатар сақланады, сонда ``product_id`` ForeignKey емес.
+    """
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='sale_items')
+    seller = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_sales')
+    product_id = models.BigIntegerField()
+    product_name = models.CharField(max_length=200)
+    size = models.CharField(max_length=5)
+    quantity = models.IntegerField(default=1)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        indexes = [models.Index(fields=['seller', 'order'], name='archived_item_seller_idx')]
+
+    @property
+    def product(self):
+        # same shape as OrderItem.product in the seller templates
+        return {'pk': self.product_id, 'name': self.product_name}
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -134,3 +237,34 @@ class Review(models.Model):
     rating = models.IntegerField(default=5)
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # admin list_filter (the changelist orders by -pk, which the rowid covers)
+        indexes = [
+            models.Index(fields=['rating'], name='review_rating_idx'),
+            models.Index(fields=['created_at'], name='review_created_idx'),
+        ]
+
+
+class RateLimitBucket(models.Model):
+    """Try-on token bucket: ``rl:<scope>:<user_pk>`` гилти ушын бир қатар.
+
+    Токенлер шәртли ``UPDATE`` пенен алынады, сонда worker-лер бир
+    бакетти бир ўақытта жумсай алмайды.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    updated = models.FloatField(help_text='Unix ўақыты (секунд)')
+
+
+class TryOnSlot(models.Model):
+    """Replicate шақырыўлары ушын глобал слот; ``expires_at`` өтсе бос."""
+    id = models.PositiveSmallIntegerField(primary_key=True)
+    holder = models.CharField(max_length=32, blank=True)
+    expires_at = models.FloatField(default=0)
+
+
+class RateLimitCounter(models.Model):
+    """Rate limit статистикасы: ``rl:stats:<scope>:<outcome>`` -> саны."""
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
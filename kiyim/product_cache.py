@@ -0,0 +1,142 @@
+"""Өним бети ушын версияланған read-through кэш.
+
+``product_detail`` көрсететуғын барлық мағлыўмат (өним, суретлер, размерлер,
+пикирлер, орташа баҳа, уқсас өнимлер) бир dict-ке жыйналып кэште
+``product:snap:<pk>:<version>`` гилти менен сақланады. ``Product``,
+``ProductImage``, ``ProductSize`` ҳәм ``Review`` жазылғанда сигналлар
+версияны жаңалайды — ески снапшот ендиги оқылмайды ҳәм TTL менен өшеди.
+
+Ҳәр өним версиясы жаңаланғанда глобал каталог версиясы (``catalog:ver``)
+да жаңаланады; дизим беттериниң ETag/Last-Modified мәнислери соннан алынады.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, OuterRef, Subquery
+
+from .db_router import primary_unless_covered
+from .models import Product, ProductImage
+
+
+def _ttl():
+    return getattr(settings, 'PRODUCT_SNAPSHOT_TTL', 600)
+
+
+CATALOG_VERSION_KEY = 'catalog:ver'
+
+
+def _version_key(pk):
+    return f'product:ver:{pk}'
+
+
+def _get_or_init(key):
+    version = cache.get(key)
+    if version is None:
+        # time-based so an evicted version never reuses an old snapshot key
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def get_version(pk):
+    return _get_or_init(_version_key(pk))
+
+
+def get_catalog_version():
+    return _get_or_init(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_version(pk):
+    now = time.time_ns()
+    cache.set_many({_version_key(pk): now, CATALOG_VERSION_KEY: now}, timeout=None)
+
+
+def build_snapshot(pk):
+    """Снапшотты базадан жыйнаў; өним жоқ яки актив емес болса ``None``."""
+    product = (
+        Product.objects.filter(pk=pk, is_active=True)
+        .select_related('seller')
+        .annotate(avg_rating=Avg('reviews__rating'), review_count=Count('reviews'))
+        .first()
+    )
+    if product is None:
+        return None
+
+    first_image = ProductImage.objects.filter(product=OuterRef('pk')).order_by('order').values('image')[:1]
+    related = (
+        Product.objects.filter(category=product.category, is_active=True)
+        .exclude(pk=pk)
+        .annotate(image=Subquery(first_image))
+        .values('pk', 'name', 'price', 'category', 'image')[:4]
+    )
+    image_field = ProductImage._meta.get_field('image')
+
+    def url(name):
+        return image_field.storage.url(name) if name else ''
+
+    return {
+        'pk': product.pk,
+        'name': product.name,
+        'category': product.category,
+        'category_display': product.get_category_display(),
+        'gender_display': product.get_gender_display(),
+        'style_display': product.get_style_display(),
+        'price': product.price,
+        'description': product.description,
+        'shop_name': product.seller.shop_name,
+        'images': [url(name) for name in product.images.values_list('image', flat=True)],
+        'sizes': list(product.sizes.order_by('pk').values('size', 'quantity')),
+        'reviews': [
+            {
+                'author': review.user.get_full_name(),
+                'rating': review.rating,
+                'comment': review.comment,
+                'created_at': review.created_at,
+            }
+            for review in product.reviews.select_related('user').order_by('-created_at')
+        ],
+        'avg_rating': round(product.avg_rating or 0, 1),
+        'review_count': product.review_count,
+        'related': [dict(row, image=url(row['image'])) for row in related],
+    }
+
+
+def get_snapshot(pk, wait=2.0, poll=0.05):
+    """Кэштен оқыў; жоқ болса бир ғана процесс қурады, басқалары күтеди.
+
+    Қулып ``cache.add`` — тек атомар backend-те (Redis, Memcached) бир
+    қурыўшыны кепилликлейди. FileBasedCache-те ``add`` тексерип-жазыў,
+    сонда еки worker бир снапшотты бирге қурыўы мүмкин; нәтийже бирдей,
+    тек базаға артық сораў кетеди. Продакшн ушын ``DJANGO_REDIS_URL`` усыныс етиледи.
+    """
+    version = get_version(pk)
+    key = f'product:snap:{pk}:{version}'
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot or None
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, timeout=max(int(wait * 5), 5)):
+        deadline = time.monotonic() + wait
+        while time.monotonic() < deadline:
+            time.sleep(poll)
+            snapshot = cache.get(key)
+            if snapshot is not None:
+                return snapshot or None
+        # lock holder is too slow; build it ourselves rather than fail
+
+    try:
+        # a read copy older than the version would cache stale data under the new key
+        with primary_unless_covered(version):
+            snapshot = build_snapshot(pk)
+        # an empty dict caches "not found" so 404s don't hit the DB either
+        cache.set(key, snapshot or {}, timeout=_ttl())
+    finally:
+        cache.delete(lock_key)
+    return snapshot
@@ -0,0 +1,177 @@
+"""Production сораўларын талап бойынша профиллеў.
+
+``PROFILING_TOKENS`` дизиминдеги мәнис ``X-Profile`` header-инде келсе
+яки ``PROFILING_SAMPLE_RATE`` үлесине түссе, сораў cProfile астында
+орынланады ҳәм барлық SQL сораўлары жазылады. Нәтийже ``PROFILING_DIR``
+папкасына ``.prof`` + ``.json`` болып сақланады; ең көбинде
+``PROFILING_MAX_FILES`` профиль қалады (ring buffer).
+
+Файлға тек ``request.path`` ҳәм ``SAFE_QUERY_PARAMS`` параметрлери
+жазылады; қалғанларының (мысалы, try-on ``api_key``) мәниси өширилип
+сақланады — профиллер дискте турады ҳәм staff-қа көрсетиледи.
+
+Өширилген жағдайда middleware ``MiddlewareNotUsed`` көтереди ҳәм
+шынжырдан толық алынады.
+"""
+import cProfile
+import contextlib
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.http import urlencode
+
+HEADER = 'HTTP_X_PROFILE'
+NAME_RE = re.compile(r'^[\w.-]+$')
+# catalog/list filters; any other value may be a secret (api_key, tokens)
+SAFE_QUERY_PARAMS = {
+    'q', 'category', 'gender', 'size', 'style', 'shop', 'sort', 'page', 'limit', 'fields',
+    'cursor', 'min_price', 'max_price', 'status', 'archive', 'date_from', 'date_to', 'download',
+}
+REDACTED = 'redacted'
+
+
+def safe_path(request):
+    """``request.path`` ҳәм қәўипсиз параметрлер; басқа мәнислер жасырылады."""
+    if not request.GET:
+        return request.path
+    query = [
+        (key, value if key in SAFE_QUERY_PARAMS else REDACTED)
+        for key, values in request.GET.lists()
+        for value in values
+    ]
+    return f'{request.path}?{urlencode(query)}'
+
+
+def profile_dir():
+    return Path(settings.PROFILING_DIR)
+
+
+def list_profiles():
+    """Профиллер метамағлыўматы, жаңасы биринши."""
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    items = []
+    for meta_path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        meta['name'] = meta_path.stem
+        items.append(meta)
+    return items
+
+
+def profile_paths(name):
+    if not NAME_RE.match(name):
+        return None, None
+    directory = profile_dir()
+    prof, meta = directory / f'{name}.prof', directory / f'{name}.json'
+    if not prof.exists():
+        return None, None
+    return prof, meta
+
+
+def stats_text(prof_path, limit=40, sort='cumulative'):
+    out = io.StringIO()
+    pstats.Stats(str(prof_path), stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'db': context['connection'].alias,
+                'sql': sql,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+                'many': many,
+            })
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.tokens = set(getattr(settings, 'PROFILING_TOKENS', ()))
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        if not self.tokens and self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 50)
+
+    def _wanted(self, request):
+        token = request.META.get(HEADER)
+        if token and token in self.tokens:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active in this thread
+            return self.get_response(request)
+        try:
+            with contextlib.ExitStack() as stack:
+                # every alias: with a read replica most catalog queries go to "read"
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self._save(request, response, profiler, recorder, elapsed)
+        response['X-Profile-Time'] = f'{elapsed:.1f}ms'
+        return response
+
+    def _save(self, request, response, profiler, recorder, elapsed):
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '_', request.path).strip('_')[:60] or 'root'
+        name = f'{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{slug}'
+
+        profiler.dump_stats(str(directory / f'{name}.prof'))
+        meta = {
+            'path': safe_path(request),
+            'method': request.method,
+            'status': response.status_code,
+            'ms': round(elapsed, 1),
+            'user': getattr(getattr(request, 'user', None), 'pk', None),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'query_count': len(recorder.queries),
+            'query_ms': round(sum(q['ms'] for q in recorder.queries), 1),
+            'queries': recorder.queries,
+        }
+        (directory / f'{name}.json').write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+        self._trim(directory)
+
+    def _trim(self, directory):
+        profiles = sorted(directory.glob('*.prof'))
+        for old in profiles[:max(len(profiles) - self.max_files, 0)]:
+            for path in (old, old.with_suffix('.json')):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,231 @@
+"""Try-on endpoint-лери ушын rate limit ҳәм бир ўақыттағы шақырыўлар шеги.
+
+``run`` (сийрек ҳәм қымбат) — базадағы token bucket ҳәм есаплағышлар.
+Олар тек шәртли ``UPDATE ... WHERE`` пенен өзгереди, сонда барлық
+gunicorn worker-лери ушын атомар; FileBasedCache-тиң ``add``/``incr``
+тексерип-жазыўы атомар емес, ал ``run`` шегиниң дәл болыўы керек.
+
+``status`` (JS ҳәр бир неше секундта сорайды) — базаға тиймейди:
+кэштеги fixed window есаплағышы (``cache.add`` + ``cache.incr``).
+Redis кэшинде (``DJANGO_REDIS_URL``) бул атомар, FileBasedCache-те
+параллель сораўлар шекти сәл асырыўы мүмкин — поллинг ушын жетерли.
+
+Глобал слотлар (``TRYON_MAX_CONCURRENT``) тек сыртқы Replicate
+шақырыўының өзин орайды (``outbound_call``), upload оқыў ҳәм суретти
+таярлаўды емес. Слоттың TTL-ы бар — worker қулап қалса да слот ўақты
+өтип босайды; слотты тек оны алған сораў босата алады.
+
+Шектен асқан сораў дәрҳал 429 ҳәм ``Retry-After`` алады. Лимит
+жағдайын оқыў мүмкин болмаса да сораў өткерилмейди (fail closed).
+"""
+import logging
+import math
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Least
+from django.http import JsonResponse
+
+from .models import RateLimitBucket, RateLimitCounter, TryOnSlot
+
+logger = logging.getLogger(__name__)
+
+STATS = ('allowed', 'limited', 'busy')
+SCOPES = ('run', 'status')
+# polled scopes: limiter state and counters in the cache, never in the DB
+CACHE_SCOPES = ('status',)
+
+
+class Busy(Exception):
+    """Бос глобал слот жоқ."""
+
+
+def _limits(user, scope):
+    limits = settings.TRYON_RATE_LIMITS
+    role = 'staff' if user.is_staff else getattr(user, 'role', 'default')
+    per_role = limits.get(role, limits['default'])
+    return per_role.get(scope, limits['default'][scope])
+
+
+def _incr(key):
+    """UPDATE, жоқ болса INSERT (``trending.record`` сыяқлы)."""
+    counters = RateLimitCounter.objects.filter(key=key)
+    if counters.update(value=F('value') + 1):
+        return
+    try:
+        with transaction.atomic():
+            RateLimitCounter.objects.create(key=key, value=1)
+    except IntegrityError:
+        # another worker created the row first
+        counters.update(value=F('value') + 1)
+
+
+def _cache_incr(key, timeout=None):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # expired between add() and incr()
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def record(scope, outcome):
+    key = f'rl:stats:{scope}:{outcome}'
+    try:
+        if scope in CACHE_SCOPES:
+            _cache_incr(key)
+        else:
+            _incr(key)
+    except Exception:
+        # statistics only; never fail the request because of them
+        logger.warning('rate limit counter %s:%s not recorded', scope, outcome, exc_info=True)
+
+
+def stats():
+    keys = [f'rl:stats:{scope}:{outcome}' for scope in SCOPES for outcome in STATS]
+    values = dict(RateLimitCounter.objects.filter(key__startswith='rl:stats:').values_list('key', 'value'))
+    values.update(cache.get_many([key for key in keys if key.split(':')[2] in CACHE_SCOPES]))
+    return {
+        scope: {outcome: values.get(f'rl:stats:{scope}:{outcome}', 0) for outcome in STATS}
+        for scope in SCOPES
+    }
+
+
+def in_flight():
+    return TryOnSlot.objects.filter(
+        pk__lt=settings.TRYON_MAX_CONCURRENT, expires_at__gt=time.time(),
+    ).count()
+
+
+def take_token(key, capacity, per_seconds, now=None):
+    """Token bucket: ``(allowed, retry_after_seconds)``.
+
+    Толықтырыў ҳәм алыў бир шәртли ``UPDATE`` — токен жетпесе қатар
+    өзгермейди, сонда параллель сораўлар бакетти асыра жумсай алмайды.
+    """
+    now = time.time() if now is None else now
+    rate = capacity / per_seconds
+    available = Least(
+        Value(float(capacity)),
+        F('tokens') + (Value(now) - F('updated')) * Value(rate),
+        output_field=FloatField(),
+    )
+    bucket = RateLimitBucket.objects.filter(key=key)
+    for _ in range(2):
+        if bucket.alias(available=available).filter(available__gte=1).update(tokens=available - 1, updated=now):
+            return True, 0
+        if bucket.exists():
+            break
+        try:
+            with transaction.atomic():
+                RateLimitBucket.objects.create(key=key, tokens=capacity - 1, updated=now)
+            return True, 0
+        except IntegrityError:
+            # created concurrently; take from that row instead
+            continue
+    row = bucket.values_list('tokens', 'updated').first()
+    tokens = min(capacity, row[0] + (now - row[1]) * rate) if row else 0
+    return False, max(1, math.ceil((1 - tokens) / rate))
+
+
+def take_window(key, limit, per_seconds, now=None):
+    """Кэштеги fixed window: ``(allowed, retry_after_seconds)``."""
+    now = time.time() if now is None else now
+    window = int(now // per_seconds)
+    count = _cache_incr(f'{key}:{window}', per_seconds + 1)
+    if count <= limit:
+        return True, 0
+    return False, max(1, math.ceil((window + 1) * per_seconds - now))
+
+
+def _ensure_slots(count):
+    TryOnSlot.objects.bulk_create([TryOnSlot(id=i) for i in range(count)], ignore_conflicts=True)
+
+
+def acquire_slot():
+    """Глобал слотлардың биреўин алыў: ``(slot_id, holder)``; бос болмаса ``None``."""
+    count = settings.TRYON_MAX_CONCURRENT
+    now = time.time()
+    free = list(TryOnSlot.objects.filter(pk__lt=count, expires_at__lte=now).values_list('pk', flat=True))
+    if not free and TryOnSlot.objects.filter(pk__lt=count).count() < count:
+        _ensure_slots(count)
+        free = list(TryOnSlot.objects.filter(pk__lt=count, expires_at__lte=now).values_list('pk', flat=True))
+    # spread workers over the free slots so they rarely race for the same row
+    random.shuffle(free)
+    holder = uuid.uuid4().hex
+    for pk in free:
+        claimed = TryOnSlot.objects.filter(pk=pk, expires_at__lte=now).update(
+            holder=holder, expires_at=now + settings.TRYON_SLOT_TIMEOUT,
+        )
+        if claimed:
+            return pk, holder
+    return None
+
+
+def release_slot(slot):
+    """Тек өзимиз алған слотты босатыў (TTL өтип басқа сораў алған болса тиймеймиз)."""
+    pk, holder = slot
+    try:
+        TryOnSlot.objects.filter(pk=pk, holder=holder).update(holder='', expires_at=0)
+    except DatabaseError:
+        # the slot frees itself when TRYON_SLOT_TIMEOUT passes
+        logger.warning('try-on slot %s not released', pk, exc_info=True)
+
+
+def _too_many(message, retry_after):
+    response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def busy_response():
+    return _too_many('Сервер бос емес, кейинирек урынып көриң.', settings.TRYON_BUSY_RETRY_AFTER)
+
+
+@contextmanager
+def outbound_call(scope='run'):
+    """Глобал слотты тек сыртқы шақырыў ўақтына алыў; бос болмаса ``Busy``."""
+    try:
+        slot = acquire_slot()
+    except DatabaseError as exc:
+        # fail closed, as in throttle()
+        logger.warning('try-on slots unavailable', exc_info=True)
+        raise Busy from exc
+    if slot is None:
+        record(scope, 'busy')
+        raise Busy
+    try:
+        yield
+    finally:
+        release_slot(slot)
+
+
+def throttle(scope):
+    """View-ди пайдаланыўшы лимити менен орап алыў (слот — ``outbound_call``)."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            capacity, per_seconds = _limits(request.user, scope)
+            take = take_window if scope in CACHE_SCOPES else take_token
+            try:
+                allowed, retry_after = take(f'rl:{scope}:{request.user.pk}', capacity, per_seconds)
+            except Exception:
+                # fail closed: without the shared state we can't enforce the limits
+                # (cache backends raise their own connection errors)
+                logger.warning('rate limit state unavailable', exc_info=True)
+                return busy_response()
+            if not allowed:
+                record(scope, 'limited')
+                return _too_many('Тым көп сораў! Бираз күтиң.', retry_after)
+            record(scope, 'allowed')
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,104 @@
+"""Ески мағлыўматларды тазалаў: ташланған себетлер ҳәм суўық буйрытмалар.
+
+Екеўи де киши топтамлар менен ислейди: ҳәр топтам өз қысқа
+транзакциясында, арасында ``pause`` секунд тыным — SQLite write lock-ы
+узақ услап турылмайды. Өңделген қатарлар дәрҳал өшириледи, сонда
+тоқтатылған жумыс қайта иске түскенде қалған жеринен даўам етеди.
+
+Архивленген буйрытманың сатыўшы қатарлары ``ArchivedOrderItem``-ке
+көшириледи — сатыўшы табысы ҳәм экспорты оларды жоғалтпайды.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Cart, Order, OrderItem
+
+# only orders that can no longer change are archived
+FINAL_STATUSES = ('delivered', 'cancelled')
+
+
+def _settings(batch_size, pause):
+    if batch_size is None:
+        batch_size = getattr(settings, 'RETENTION_BATCH_SIZE', 500)
+    if pause is None:
+        pause = getattr(settings, 'RETENTION_PAUSE_SECONDS', 0.2)
+    return batch_size, pause
+
+
+def cart_cutoff(now=None):
+    now = now or timezone.now()
+    return now - timedelta(days=settings.CART_TTL_DAYS)
+
+
+def order_cutoff(now=None):
+    now = now or timezone.now()
+    # months approximated as 30 days; precision doesn't matter for retention
+    return now - timedelta(days=30 * settings.ORDER_ARCHIVE_AFTER_MONTHS)
+
+
+def purge_carts(now=None, batch_size=None, pause=None, max_batches=None):
+    """``CART_TTL_DAYS`` күннен ески себет қатарларын топтамлап өшириў."""
+    batch_size, pause = _settings(batch_size, pause)
+    stale = Cart.objects.filter(added_at__lt=cart_cutoff(now))
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        pks = list(stale.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        deleted += Cart.objects.filter(pk__in=pks).delete()[0]
+        batches += 1
+        if len(pks) < batch_size:
+            break
+        time.sleep(pause)
+    return deleted
+
+
+def _archive_batch(orders):
+    items, sales = {}, []
+    rows = OrderItem.objects.filter(order_id__in=[o.pk for o in orders]).order_by('pk').values_list(
+        'order_id', 'product_id', 'product__name', 'product__seller_id', 'product__seller__shop_name',
+        'size', 'quantity', 'price',
+    )
+    for order_id, product_id, name, seller_id, shop_name, size, quantity, price in rows:
+        items.setdefault(order_id, []).append([product_id, name, shop_name, size, quantity, str(price)])
+        sales.append(ArchivedOrderItem(
+            order_id=order_id, seller_id=seller_id, product_id=product_id, product_name=name,
+            size=size, quantity=quantity, price=price,
+        ))
+
+    with transaction.atomic():
+        # an order archived by an earlier run must not get its seller rows twice
+        done = set(ArchivedOrder.objects.filter(pk__in=[o.pk for o in orders]).values_list('pk', flat=True))
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(
+                id=o.pk, user_id=o.user_id, created_at=o.created_at, status=o.status,
+                total_price=o.total_price, address=o.address, items=items.get(o.pk, []),
+            )
+            for o in orders if o.pk not in done
+        ])
+        ArchivedOrderItem.objects.bulk_create([sale for sale in sales if sale.order_id not in done])
+        Order.objects.filter(pk__in=[o.pk for o in orders]).delete()
+
+
+def archive_orders(now=None, batch_size=None, pause=None, max_batches=None):
+    """``ORDER_ARCHIVE_AFTER_MONTHS`` айдан ески жабық буйрытмаларды архивке көшириў."""
+    batch_size, pause = _settings(batch_size, pause)
+    cold = Order.objects.filter(created_at__lt=order_cutoff(now), status__in=FINAL_STATUSES)
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        orders = list(cold.order_by('pk').only(
+            'pk', 'user_id', 'created_at', 'status', 'total_price', 'address',
+        )[:batch_size])
+        if not orders:
+            break
+        _archive_batch(orders)
+        archived += len(orders)
+        batches += 1
+        if len(orders) < batch_size:
+            break
+        time.sleep(pause)
+    return archived
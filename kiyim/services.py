@@ -0,0 +1,222 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .db_router import use_primary
+from .models import Product, ProductImage, ProductSize, SIZE_BITS, SIZE_CHOICES, size_mask
+from .product_cache import bump_version
+
+MAX_PRODUCT_IMAGES = 5
+SIZE_VALUES = [value for value, _ in SIZE_CHOICES]
+# Counter-only writes don't change what the product page shows
+COUNTER_FIELDS = {'views_count', 'trending_score'}
+# API ?sort= -> (column, descending); pk breaks ties
+SORTS = {
+    'new': ('pk', True),
+    'price': ('price', False),
+    '-price': ('price', True),
+    'popular': ('views_count', True),
+}
+
+_syncing_stock = ContextVar('kiyim_syncing_stock', default=False)
+
+
+@contextmanager
+def syncing_stock():
+    """Ишинде ``ProductSize`` сигналлары қалдықты есапламайды — шақырыўшы өзи бир рет есаплайды."""
+    token = _syncing_stock.set(True)
+    try:
+        yield
+    finally:
+        _syncing_stock.reset(token)
+
+
+def stock_refresh_deferred():
+    return _syncing_stock.get()
+
+
+def parse_sizes(sizes, quantities):
+    """POST-тағы ``sizes``/``quantities`` дизимлерин {размер: саны} етиў."""
+    result = {}
+    for size, qty in zip(sizes, quantities):
+        if size not in SIZE_VALUES or qty in (None, ''):
+            continue
+        try:
+            result[size] = max(int(qty), 0)
+        except (TypeError, ValueError):
+            continue
+    return result
+
+
+def parse_price(value):
+    """GET-тағы баҳа: ``Decimal`` яки (бос/қәте болса) ``None``."""
+    if value in (None, ''):
+        return None
+    try:
+        price = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() else None
+
+
+def filter_products(products, params):
+    """``product_list`` ҳәм API ортақ фильтрлери (GET параметрлери бойынша)."""
+    category = params.get('category')
+    gender = params.get('gender')
+    size = params.get('size')
+    style = params.get('style')
+    shop = params.get('shop')
+    search = params.get('q')
+    # invalid prices are ignored here; the API rejects them before calling us
+    min_price = parse_price(params.get('min_price'))
+    max_price = parse_price(params.get('max_price'))
+
+    if category:
+        products = products.filter(category=category)
+    if gender:
+        products = products.filter(gender__in=[gender, 'unisex'])
+    if size:
+        products = filter_by_sizes(products, size.split(','))
+    if style:
+        products = products.filter(style=style)
+    if shop:
+        products = products.filter(seller__shop_name=shop)
+    if search:
+        products = products.filter(Q(name__icontains=search) | Q(description__icontains=search))
+    if min_price is not None:
+        products = products.filter(price__gte=min_price)
+    if max_price is not None:
+        products = products.filter(price__lte=max_price)
+    return products
+
+
+def filter_by_sizes(products, sizes):
+    """Бир bitwise шәрт: дизимдеги размерлердиң кеминде биреўи қолда бар."""
+    mask = size_mask(size.strip().upper() for size in sizes)
+    if not mask:
+        return products.none()
+    return products.alias(size_hit=F('size_mask').bitand(mask)).filter(size_hit__gt=0)
+
+
+def compute_stock(product_ids=None):
+    """``ProductSize``-тан ``{product_id: (size_mask, total_stock)}``."""
+    rows = ProductSize.objects.filter(quantity__gt=0)
+    if product_ids is not None:
+        rows = rows.filter(product_id__in=product_ids)
+    stock = {}
+    for product_id, size, quantity in rows.values_list('product_id', 'size', 'quantity').iterator():
+        mask, total = stock.get(product_id, (0, 0))
+        stock[product_id] = (mask | SIZE_BITS.get(size, 0), total + quantity)
+    return stock
+
+
+def refresh_product_stock(product_ids):
+    """``size_mask``/``total_stock``-ты ``ProductSize`` бойынша қайта жазыў.
+
+    ProductSize өзгерген транзакцияның ишинде шақырылыўы керек. Оқыў
+    ``default``-тан болыўы шәрт: ``read`` көширмесинен алынған ески
+    мәнислер ``default``-қа қайта жазылып қалар еди.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    with use_primary():
+        stock = compute_stock(product_ids)
+    products = []
+    for pk in product_ids:
+        mask, total = stock.get(pk, (0, 0))
+        products.append(Product(pk=pk, size_mask=mask, total_stock=total))
+    Product.objects.bulk_update(products, ['size_mask', 'total_stock'], batch_size=500)
+
+
+def sync_product_sizes(product, wanted):
+    """Бар размерлерди жаңа мәнислер менен салыстырып, тек өзгерислерди жазыў.
+
+    Өзгермеген қатарлар тийилмейди, сонда ``ProductSize`` id-лери сақланады.
+    Ең көп 4 сорау: оқыў, bulk_create, bulk_update, delete; қалдық соңында
+    бир рет есапланады (delete сигналы оны қайталамайды).
+    """
+    existing = {ps.size: ps for ps in product.sizes.all()}
+
+    to_create = [
+        ProductSize(product=product, size=size, quantity=qty)
+        for size, qty in wanted.items() if size not in existing
+    ]
+    to_update = []
+    for size, ps in existing.items():
+        if size in wanted and ps.quantity != wanted[size]:
+            ps.quantity = wanted[size]
+            to_update.append(ps)
+    to_delete = [ps.pk for size, ps in existing.items() if size not in wanted]
+
+    if to_create:
+        ProductSize.objects.bulk_create(to_create)
+    if to_update:
+        ProductSize.objects.bulk_update(to_update, ['quantity'])
+    if to_delete:
+        with syncing_stock():
+            ProductSize.objects.filter(pk__in=to_delete).delete()
+    if to_create or to_update or to_delete:
+        refresh_product_stock([product.pk])
+    return to_create, to_update, to_delete
+
+
+def sync_product_images(product, new_files, keep_ids=None):
+    """Суретлерди өшириў, қайта тәртиплеў ҳәм жаңаларын қосыў.
+
+    ``keep_ids`` — қалатуғын суретлердиң id-лери, керекли тәртипте.
+    ``None`` болса бар суретлер өзгериссиз қалады. Өширилген файллар
+    транзакция табыслы питкеннен кейин дисктен алынады.
+    """
+    existing = {img.pk: img for img in product.images.all()}
+
+    if keep_ids is None:
+        keep = sorted(existing.values(), key=lambda img: (img.order, img.pk))
+    else:
+        keep = []
+        for pk in keep_ids:
+            img = existing.get(int(pk)) if str(pk).isdigit() else None
+            if img is not None and img not in keep:
+                keep.append(img)
+    kept = {img.pk for img in keep}
+    removed = [img for pk, img in existing.items() if pk not in kept]
+
+    to_update = []
+    for i, img in enumerate(keep):
+        if img.order != i:
+            img.order = i
+            to_update.append(img)
+
+    free = max(MAX_PRODUCT_IMAGES - len(keep), 0)
+    to_create = [
+        ProductImage(product=product, image=f, order=len(keep) + i)
+        for i, f in enumerate(new_files[:free])
+    ]
+
+    if removed:
+        ProductImage.objects.filter(pk__in=[img.pk for img in removed]).delete()
+        names = [img.image.name for img in removed if img.image]
+        storage = ProductImage._meta.get_field('image').storage
+        transaction.on_commit(lambda: [storage.delete(name) for name in names])
+    if to_update:
+        ProductImage.objects.bulk_update(to_update, ['order'])
+    if to_create:
+        ProductImage.objects.bulk_create(to_create)
+    return to_create, to_update, removed
+
+
+def save_product(form, sizes, new_files, keep_image_ids=None, seller=None):
+    """Өним формасын, размерлерди ҳәм суретлерди бир транзакцияда сақлаў."""
+    with transaction.atomic():
+        product = form.save(commit=False)
+        if seller is not None:
+            product.seller = seller
+        product.save()
+        sync_product_sizes(product, sizes)
+        sync_product_images(product, new_files, keep_image_ids)
+        # bulk writes above don't send signals
+        transaction.on_commit(lambda: bump_version(product.pk))
+    return product
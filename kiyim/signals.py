@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth_backends import evict_user
+from .models import Product, ProductImage, ProductSize, Review, User
+from .product_cache import bump_version
+from .services import COUNTER_FIELDS, refresh_product_stock, stock_refresh_deferred
+
+
+def _bump_on_commit(product_id):
+    transaction.on_commit(lambda: bump_version(product_id))
+
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= COUNTER_FIELDS:
+        return
+    _bump_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver([post_save, post_delete], sender=ProductSize)
+@receiver([post_save, post_delete], sender=Review)
+def product_child_changed(sender, instance, **kwargs):
+    if sender is ProductSize and not stock_refresh_deferred():
+        refresh_product_stock([instance.product_id])
+    _bump_on_commit(instance.product_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    evict_user(instance.pk)
+    transaction.on_commit(lambda: evict_user(instance.pk))
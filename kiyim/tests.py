@@ -0,0 +1,257 @@
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from . import db_router
+from .autocomplete import PrefixIndex
+from .forms import ProductForm
+from .imaging import ImageRejected, prepare_tryon_image
+from .profiling import list_profiles
+from .models import Product, ProductImage, ProductSize, User
+from .services import save_product
+
+
+class SaveProductQueryTests(TestCase):
+    """``save_product`` ишиндеги сораўлар саны: diff, қайта жаратыў емес."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user('seller', password='x', role='seller', shop_name='Дүкан')
+        cls.product = Product.objects.create(seller=cls.seller, name='Куртка', category='ustki', price=100)
+        for size, qty in (('S', 1), ('M', 2), ('L', 3)):
+            ProductSize.objects.create(product=cls.product, size=size, quantity=qty)
+        for i, name in enumerate(('a', 'b', 'c')):
+            ProductImage.objects.create(product=cls.product, image=f'products/{name}.jpg', order=i)
+
+    def _form(self, **changes):
+        data = {
+            'name': self.product.name, 'category': self.product.category, 'price': self.product.price,
+            'gender': self.product.gender, 'style': self.product.style, 'description': self.product.description,
+        }
+        data.update(changes)
+        form = ProductForm(data, instance=self.product)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form
+
+    def test_price_only_edit(self):
+        form = self._form(price='120')
+        size_ids = set(self.product.sizes.values_list('pk', flat=True))
+        image_ids = list(self.product.images.order_by('order').values_list('pk', flat=True))
+
+        # savepoint, UPDATE product, SELECT sizes, SELECT images, release
+        with self.assertNumQueries(5):
+            save_product(form, sizes={'S': 1, 'M': 2, 'L': 3}, new_files=[], keep_image_ids=image_ids)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, 120)
+        self.assertEqual(set(self.product.sizes.values_list('pk', flat=True)), size_ids)
+        self.assertEqual(list(self.product.images.order_by('order').values_list('pk', flat=True)), image_ids)
+
+    def test_size_diff_and_image_reorder(self):
+        form = self._form()
+        kept = {ps.size: ps.pk for ps in self.product.sizes.all()}
+        a, b, c = self.product.images.order_by('order').values_list('pk', flat=True)
+
+        # savepoint, UPDATE product;
+        # sizes: SELECT, INSERT XL, UPDATE M, SELECT+DELETE S, one stock refresh (SELECT+UPDATE);
+        # images: SELECT, one bulk UPDATE of the order column; release
+        with self.assertNumQueries(12):
+            save_product(form, sizes={'M': 5, 'L': 3, 'XL': 1}, new_files=[], keep_image_ids=[c, a, b])
+
+        sizes = {ps.size: ps for ps in self.product.sizes.all()}
+        self.assertEqual({size: ps.quantity for size, ps in sizes.items()}, {'M': 5, 'L': 3, 'XL': 1})
+        # unchanged and updated rows keep their ids
+        self.assertEqual(sizes['M'].pk, kept['M'])
+        self.assertEqual(sizes['L'].pk, kept['L'])
+        self.assertEqual(list(self.product.images.order_by('order').values_list('pk', flat=True)), [c, a, b])
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.total_stock, 9)
+
+
+def _upload(size, fmt='JPEG', mode='RGB'):
+    buf = io.BytesIO()
+    Image.new(mode, size, 'red').save(buf, fmt)
+    return SimpleUploadedFile(f'photo.{fmt.lower()}', buf.getvalue())
+
+
+@override_settings(TRYON_INPUT_SIZE=(768, 1024))
+class PrepareTryonImageTests(SimpleTestCase):
+    """Try-on суретин киширейтиў ҳәм JPEG-ке өткериў."""
+
+    def test_oversized_jpeg_fits_target(self):
+        out, meta = prepare_tryon_image(_upload((3000, 4000)))
+
+        with Image.open(out) as img:
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, (768, 1024))
+        self.assertEqual(meta['source_size'], (3000, 4000))
+        self.assertEqual(meta['source_format'], 'JPEG')
+        self.assertEqual(meta['bytes'], len(out.getvalue()))
+
+    def test_png_with_alpha_becomes_rgb_jpeg(self):
+        out, meta = prepare_tryon_image(_upload((2000, 1000), fmt='PNG', mode='RGBA'))
+
+        with Image.open(out) as img:
+            self.assertEqual((img.format, img.mode), ('JPEG', 'RGB'))
+            # aspect ratio kept, bounded by the width
+            self.assertEqual(img.size, (768, 384))
+        self.assertEqual(meta['source_format'], 'PNG')
+
+    @override_settings(TRYON_MAX_INPUT_PIXELS=1000)
+    def test_too_many_pixels_rejected(self):
+        with self.assertRaises(ImageRejected):
+            prepare_tryon_image(_upload((100, 100)))
+
+    def test_not_an_image_rejected(self):
+        with self.assertRaises(ImageRejected):
+            prepare_tryon_image(SimpleUploadedFile('photo.jpg', b'not an image'))
+
+
+class ProfilingRedactionTests(TestCase):
+    """Профиль файлларына query string-теги сырлар жазылмаўы керек."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_api_key_not_persisted(self):
+        with override_settings(PROFILING_TOKENS=['t'], PROFILING_DIR=self.directory):
+            response = self.client.get(
+                reverse('product_list'), {'category': 'ustki', 'api_key': 'r8_live_secret'},
+                HTTP_X_PROFILE='t',
+            )
+            profiles = list_profiles()
+
+        self.assertIn('X-Profile-Time', response)
+        self.assertEqual(len(profiles), 1)
+        self.assertIn('category=ustki', profiles[0]['path'])
+        self.assertIn('api_key=redacted', profiles[0]['path'])
+        for path in Path(self.directory).iterdir():
+            self.assertNotIn(b'r8_live_secret', path.read_bytes())
+
+
+def _rows(names, views=0, start=1):
+    # (pk, name, category, shop_name, views_count, trending_score)
+    return [(pk, name, 'ustki', '', views, 0) for pk, name in enumerate(names, start=start)]
+
+
+class PrefixIndexTests(SimpleTestCase):
+    """Autocomplete: популярлық бойынша тәртип ҳәм инкрементал жаңалаў."""
+
+    def test_ranks_all_matches_by_popularity(self):
+        rows = _rows([f'ка{i:05d}' for i in range(2000)]) + [(9999, 'кафтан', 'ustki', '', 10**6, 0)]
+        index = PrefixIndex()
+        index.rebuild(rows)
+
+        for query in ('ка', 'каф'):
+            entry, label, _ = index.search(query, limit=3)[0]
+            self.assertEqual((entry, label), (('p', 9999), 'кафтан'))
+        # the memoized short prefix keeps the right answer
+        self.assertEqual(index.search('ка', limit=3)[0][1], 'кафтан')
+
+    @override_settings(AUTOCOMPLETE_MEMORY_BUDGET_MB=0.01)
+    def test_products_over_budget_do_not_force_rebuild(self):
+        rows = _rows([f'өним {i}' for i in range(500)])
+        index = PrefixIndex()
+        index.rebuild(rows)
+        self.assertTrue(index.tables.excluded)
+
+        renamed = [(pk, 'тон' if pk == 1 else name, *rest) for pk, name, *rest in rows]
+        with mock.patch.object(index, 'rebuild') as rebuild:
+            index.apply_changes(renamed)
+        rebuild.assert_not_called()
+        self.assertEqual(index.search('то')[0][1], 'тон')
+
+
+@override_settings(DATABASE_ROUTERS=['kiyim.db_router.ReadWriteRouter'])
+class ReadWriteRouterTests(TransactionTestCase):
+    """``read`` снапшоты бөлек SQLite файлы: оқыўлар қашан оған кетеди."""
+
+    def setUp(self):
+        self.seller = User.objects.create_user('seller', password='x', role='seller')
+        Product.objects.create(seller=self.seller, name='Бурынғы', category='ustki', price=10)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'read.sqlite3')
+        connections['default'].ensure_connection()
+        with sqlite3.connect(self.path) as snapshot:
+            connections['default'].connection.backup(snapshot)
+        snapshot.close()
+
+        databases = mock.patch.dict(connections.databases, {
+            db_router.READ_ALIAS: dict(connections.databases['default'], NAME=self.path),
+        })
+        databases.start()
+        self.addCleanup(databases.stop)
+        self.addCleanup(self._drop_read_connection)
+
+        # a written row only the primary has
+        Product.objects.create(seller=self.seller, name='Кейинги', category='ustki', price=10)
+        self._fresh_state()
+
+    def _drop_read_connection(self):
+        connections[db_router.READ_ALIAS].close()
+        del connections[db_router.READ_ALIAS]
+
+    def _fresh_state(self):
+        token = db_router._current.set(db_router._State())
+        self.addCleanup(db_router._current.reset, token)
+
+    def _names(self):
+        return set(Product.objects.values_list('name', flat=True))
+
+    def test_reads_go_to_snapshot(self):
+        self.assertEqual(Product.objects.all().db, db_router.READ_ALIAS)
+        self.assertEqual(self._names(), {'Бурынғы'})
+
+    def test_write_pins_reads_to_default(self):
+        Product.objects.filter(name='Бурынғы').update(price=20)
+        self.assertEqual(Product.objects.all().db, 'default')
+        self.assertEqual(self._names(), {'Бурынғы', 'Кейинги'})
+
+    def test_ignored_writes_keep_snapshot(self):
+        with db_router.ignore_writes():
+            Product.objects.filter(name='Бурынғы').update(views_count=1)
+        self.assertEqual(self._names(), {'Бурынғы'})
+
+    def test_primary_unless_covered(self):
+        synced = db_router.read_synced_at()
+        with db_router.primary_unless_covered(synced + 1):
+            self.assertEqual(self._names(), {'Бурынғы', 'Кейинги'})
+        with db_router.primary_unless_covered(synced):
+            self.assertEqual(self._names(), {'Бурынғы'})
+        # the block leaves no stickiness behind
+        self.assertEqual(self._names(), {'Бурынғы'})
+
+    def test_sticky_session_after_write(self):
+        middleware = db_router.StickyWritesMiddleware(lambda request: HttpResponse(sorted(self._names())))
+        request = RequestFactory().get('/')
+        request.session = SessionBase()
+        request.session[db_router.SESSION_KEY] = time.time() + 10
+        self.assertEqual(middleware(request).content.decode(), 'Бурынғы')
+
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'x'
+        self.assertEqual(middleware(request).content.decode(), 'БурынғыКейинги')
+
+    def test_anonymous_request_does_not_load_session(self):
+        middleware = db_router.StickyWritesMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/')
+        request.session = mock.Mock(spec=SessionBase)
+        middleware(request)
+        request.session.get.assert_not_called()
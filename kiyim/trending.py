@@ -0,0 +1,71 @@
+"""Trending рейтинги: белсендилик есаплағышлары ҳәм ыдыраўшы балл.
+
+Көриўлер, себетке қосыўлар ҳәм сатып алыўлар ``ProductActivity``
+саатлық бакетлерине жазылады. ``compute_trending`` командасы мезгил-мезгил
+ҳәр өним ушын экспоненциал ыдыраған баллды есаплап ``Product.trending_score``
+бағанасына жазады; бас бет тек индексли ``ORDER BY`` оқыйды.
+"""
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Product, ProductActivity
+from .product_cache import bump_catalog_version
+
+SIGNALS = ('views', 'cart_adds', 'purchases')
+
+
+def current_bucket(now=None):
+    return int((now if now is not None else time.time()) // 3600)
+
+
+def record(product_id, signal, amount=1, now=None):
+    """Бир сигналды есаплағышқа қосыў (UPDATE, жоқ болса INSERT)."""
+    if signal not in SIGNALS:
+        raise ValueError(f'Белгисиз сигнал: {signal}')
+    bucket = current_bucket(now)
+    rows = ProductActivity.objects.filter(product_id=product_id, bucket=bucket)
+    if rows.update(**{signal: F(signal) + amount}):
+        return
+    try:
+        with transaction.atomic():
+            ProductActivity.objects.create(product_id=product_id, bucket=bucket, **{signal: amount})
+    except IntegrityError:
+        # another request created the bucket first
+        rows.update(**{signal: F(signal) + amount})
+
+
+def compute_scores(now=None):
+    """Терезедеги бакетлерди оқып, {product_id: балл} қайтарыў."""
+    half_life = settings.TRENDING_HALF_LIFE_HOURS
+    weights = settings.TRENDING_WEIGHTS
+    now_bucket = current_bucket(now)
+    oldest = now_bucket - int(half_life * settings.TRENDING_WINDOW_HALF_LIVES)
+
+    scores = {}
+    rows = ProductActivity.objects.filter(bucket__gt=oldest).values_list(
+        'product_id', 'bucket', *SIGNALS
+    )
+    for product_id, bucket, *counts in rows.iterator(chunk_size=5000):
+        raw = sum(weights.get(name, 0) * count for name, count in zip(SIGNALS, counts))
+        decay = 0.5 ** (max(now_bucket - bucket, 0) / half_life)
+        scores[product_id] = scores.get(product_id, 0.0) + raw * decay
+    return scores, oldest
+
+
+def update_trending(now=None, batch_size=500):
+    """Балларды ``Product.trending_score``-ға жазып, ески бакетлерди өшириў."""
+    scores, oldest = compute_scores(now)
+    with transaction.atomic():
+        Product.objects.exclude(trending_score=0).update(trending_score=0)
+        Product.objects.bulk_update(
+            [Product(pk=pk, trending_score=round(score, 4)) for pk, score in scores.items()],
+            ['trending_score'],
+            batch_size=batch_size,
+        )
+        # featured order on the home page changed
+        transaction.on_commit(bump_catalog_version)
+    pruned, _ = ProductActivity.objects.filter(bucket__lte=oldest).delete()
+    return len(scores), pruned
@@ -21,9 +21,15 @@ urlpatterns = [
     path('seller/product/<int:pk>/edit/', views.edit_product, name='edit_product'),
     path('seller/product/<int:pk>/delete/', views.delete_product, name='delete_product'),
     path('seller/order/<int:pk>/status/', views.update_order_status, name='update_order_status'),
+    path('seller/orders/', views.seller_orders, name='seller_orders'),
+    path('seller/orders/status/', views.seller_orders_bulk_status, name='seller_orders_bulk_status'),
+    path('seller/orders/export/', views.seller_export_orders, name='seller_export_orders'),
+    path('seller/catalog/import/', views.seller_import, name='seller_import'),
+    path('seller/catalog/export/', views.seller_export_catalog, name='seller_export_catalog'),
 
     # Products
     path('products/', views.product_list, name='product_list'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
     path('products/<int:pk>/', views.product_detail, name='product_detail'),
 
     # Virtual Try-On
@@ -31,11 +37,22 @@ urlpatterns = [
     path('try-on/<int:product_pk>/', views.virtual_tryon, name='virtual_tryon_product'),
     path('try-on/api/run/', views.tryon_api_run, name='tryon_api_run'),
     path('try-on/api/status/<str:prediction_id>/', views.tryon_api_status, name='tryon_api_status'),
+    path('try-on/api/limits/', views.tryon_api_limits, name='tryon_api_limits'),
 
     # Cart
     path('cart/', views.cart_view, name='cart'),
+    path('cart/count/', views.cart_count, name='cart_count'),
     path('cart/add/<int:pk>/', views.add_to_cart, name='add_to_cart'),
     path('cart/remove/<int:pk>/', views.remove_from_cart, name='remove_from_cart'),
     path('checkout/', views.checkout, name='checkout'),
+
+    # Profiling (staff)
+    path('profiles/', views.profiles_list, name='profiles_list'),
+    path('profiles/<str:name>/', views.profile_detail, name='profile_detail'),
+
+    # Read-only JSON API
+    path('api/v1/products/', views.api_products, name='api_products'),
+    path('api/v1/products/export/', views.api_products_export, name='api_products_export'),
+    path('api/v1/products/<int:pk>/', views.api_product, name='api_product'),
 ]
 # این файлды толықтырамыз — жоқарыдағы urlpatterns-ке қосылады
@@ -1,18 +1,44 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q, Avg, Count, Sum
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F, Avg, Count, Sum, Prefetch
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme, urlencode
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_GET, require_POST
 import json
+import zipfile
 
-from .models import User, Product, ProductImage, ProductSize, Cart, Order, OrderItem, Review, CATEGORY_CHOICES
+from .models import User, Product, ProductImage, ProductSize, ArchivedOrder, Cart, Order, OrderItem, Review, CATEGORY_CHOICES
 from .forms import ClientRegisterForm, SellerRegisterForm, ClientProfileForm, ProductForm, ReviewForm
+from .catalog_io import CATALOG_FIELDS, import_catalog, stream_catalog_csv, stream_orders_csv
+from .imaging import ImageRejected, prepare_tryon_image
+from . import autocomplete, catalog_api, db_router
+from .conditional import catalog_list_version, catalog_page, catalog_version, product_version
+from .product_cache import bump_version, get_snapshot
+from .services import filter_by_sizes, filter_products, parse_sizes, refresh_product_stock, save_product
+from . import profiling, ratelimit, trending
+
+logger = logging.getLogger(__name__)
 
+ORDER_STATUSES = {value for value, _ in Order.STATUS_CHOICES}
 
+
+@catalog_page(catalog_version)
 def home(request):
-    featured = Product.objects.filter(is_active=True).order_by('-views_count')[:8]
+    featured = Product.objects.filter(is_active=True).order_by('-trending_score', '-created_at')[:8]
     new_arrivals = Product.objects.filter(is_active=True).order_by('-created_at')[:8]
     categories = CATEGORY_CHOICES
     return render(request, 'kiyim/home.html', {
@@ -85,7 +111,7 @@ def client_dashboard(request):
         recommendations = recommendations.filter(gender__in=g_map.get(user.gender, ['unisex']))
     
     if user.size:
-        recommendations = recommendations.filter(sizes__size=user.size, sizes__quantity__gt=0).distinct()
+        recommendations = filter_by_sizes(recommendations, [user.size])
     
     bmi = user.bmi()
     bmi_category = ''
@@ -125,6 +151,8 @@ def seller_dashboard(request):
     total_revenue = OrderItem.objects.filter(product__seller=request.user).aggregate(
         total=Sum('price')
     )['total'] or 0
+    # sales moved to the archive by the retention job still count
+    total_revenue += request.user.archived_sales.aggregate(total=Sum('price'))['total'] or 0
     
     return render(request, 'kiyim/seller_dashboard.html', {
         'products': products,
@@ -142,22 +170,12 @@ def add_product(request):
     if request.method == 'POST':
         form = ProductForm(request.POST)
         if form.is_valid():
-            product = form.save(commit=False)
-            product.seller = request.user
-            product.save()
-            
-            # Save sizes
-            sizes = request.POST.getlist('sizes')
-            quantities = request.POST.getlist('quantities')
-            for size, qty in zip(sizes, quantities):
-                if size and qty:
-                    ProductSize.objects.create(product=product, size=size, quantity=int(qty))
-            
-            # Save images
-            images = request.FILES.getlist('images')
-            for i, img in enumerate(images[:5]):
-                ProductImage.objects.create(product=product, image=img, order=i)
-            
+            save_product(
+                form,
+                sizes=parse_sizes(request.POST.getlist('sizes'), request.POST.getlist('quantities')),
+                new_files=request.FILES.getlist('images'),
+                seller=request.user,
+            )
             messages.success(request, 'Өним қосылды!')
             return redirect('seller_dashboard')
     else:
@@ -173,21 +191,14 @@ def edit_product(request, pk):
     if request.method == 'POST':
         form = ProductForm(request.POST, instance=product)
         if form.is_valid():
-            form.save()
-            # Update sizes
-            product.sizes.all().delete()
-            sizes = request.POST.getlist('sizes')
-            quantities = request.POST.getlist('quantities')
-            for size, qty in zip(sizes, quantities):
-                if size and qty:
-                    ProductSize.objects.create(product=product, size=size, quantity=int(qty))
-            
-            # Add new images
-            new_images = request.FILES.getlist('images')
-            current_count = product.images.count()
-            for i, img in enumerate(new_images[:5-current_count]):
-                ProductImage.objects.create(product=product, image=img, order=current_count+i)
-            
+            # Размерлер diff арқалы; суретлер өширилиўи/тәртиби keep_images-тен
+            keep_images = request.POST.getlist('keep_images') if 'images_managed' in request.POST else None
+            save_product(
+                form,
+                sizes=parse_sizes(request.POST.getlist('sizes'), request.POST.getlist('quantities')),
+                new_files=request.FILES.getlist('images'),
+                keep_image_ids=keep_images,
+            )
             messages.success(request, 'Өним жаңаланды!')
             return redirect('seller_dashboard')
     else:
@@ -206,33 +217,16 @@ def delete_product(request, pk):
     return redirect('seller_dashboard')
 
 
+@catalog_page(catalog_list_version)
 def product_list(request):
     products = Product.objects.filter(is_active=True).annotate(avg_rating=Avg('reviews__rating'))
     
     category = request.GET.get('category')
     gender = request.GET.get('gender')
     size = request.GET.get('size')
-    style = request.GET.get('style')
-    search = request.GET.get('q')
-    min_price = request.GET.get('min_price')
-    max_price = request.GET.get('max_price')
     sort = request.GET.get('sort', '-created_at')
     
-    if category:
-        products = products.filter(category=category)
-    if gender:
-        products = products.filter(gender__in=[gender, 'unisex'])
-    if size:
-        products = products.filter(sizes__size=size, sizes__quantity__gt=0).distinct()
-    if style:
-        products = products.filter(style=style)
-    if search:
-        products = products.filter(Q(name__icontains=search) | Q(description__icontains=search))
-    if min_price:
-        products = products.filter(price__gte=min_price)
-    if max_price:
-        products = products.filter(price__lte=max_price)
-    
+    products = filter_products(products, request.GET)
     products = products.order_by(sort)
     
     return render(request, 'kiyim/product_list.html', {
@@ -244,33 +238,57 @@ def product_list(request):
     })
 
 
+def _count_product_view(request, pk):
+    # counters don't need read-your-writes; keep the catalog on the read alias
+    with db_router.ignore_writes():
+        if Product.objects.filter(pk=pk, is_active=True).update(views_count=F('views_count') + 1):
+            trending.record(pk, 'views')
+
+
+@require_GET
+@cache_control(public=True, max_age=60)
+def search_suggest(request):
+    results = []
+    for (kind, ref), label, _ in autocomplete.suggest(request.GET.get('q', '')[:100]):
+        if kind == 'p':
+            url = reverse('product_detail', args=[ref])
+        elif kind == 'c':
+            url = f"{reverse('product_list')}?{urlencode({'category': ref})}"
+        else:
+            url = f"{reverse('product_list')}?{urlencode({'shop': ref})}"
+        results.append({'type': {'p': 'product', 'c': 'category', 's': 'shop'}[kind], 'label': label, 'url': url})
+    return JsonResponse({'results': results})
+
+
+@catalog_page(product_version, on_get=_count_product_view)
 def product_detail(request, pk):
-    product = get_object_or_404(Product, pk=pk, is_active=True)
-    product.views_count += 1
-    product.save(update_fields=['views_count'])
-    
-    reviews = product.reviews.select_related('user').order_by('-created_at')
-    avg_rating = reviews.aggregate(avg=Avg('rating'))['avg'] or 0
-    
+    snapshot = get_snapshot(pk)
+    if snapshot is None:
+        raise Http404
+
     review_form = ReviewForm()
     if request.method == 'POST' and request.user.is_authenticated:
         review_form = ReviewForm(request.POST)
         if review_form.is_valid():
             rev = review_form.save(commit=False)
-            rev.product = product
+            rev.product_id = pk
             rev.user = request.user
             rev.save()
             messages.success(request, 'Пикириңиз қосылды!')
             return redirect('product_detail', pk=pk)
-    
-    related = Product.objects.filter(category=product.category, is_active=True).exclude(pk=pk)[:4]
-    
+
+    # the counter never bumps the snapshot version, so read it live (the
+    # increment above went to default, the read copy may lag behind)
+    with db_router.use_primary():
+        views_count = Product.objects.filter(pk=pk).values_list('views_count', flat=True).first()
+
     return render(request, 'kiyim/product_detail.html', {
-        'product': product,
-        'reviews': reviews,
-        'avg_rating': round(avg_rating, 1),
+        'product': snapshot,
+        'views_count': views_count,
+        'reviews': snapshot['reviews'],
+        'avg_rating': snapshot['avg_rating'],
         'review_form': review_form,
-        'related': related,
+        'related': snapshot['related'],
     })
 
 
@@ -291,6 +309,7 @@ def add_to_cart(request, pk):
     if not created:
         cart_item.quantity += 1
         cart_item.save()
+    trending.record(product.pk, 'cart_adds')
     
     messages.success(request, 'Себетке қосылды!')
     return redirect('cart')
@@ -303,6 +322,12 @@ def cart_view(request):
     return render(request, 'kiyim/cart.html', {'items': items, 'total': total})
 
 
+@login_required
+@never_cache
+def cart_count(request):
+    return JsonResponse({'count': request.user.cart_items.count()})
+
+
 @login_required
 @require_POST
 def remove_from_cart(request, pk):
@@ -321,50 +346,202 @@ def checkout(request):
     address = request.POST.get('address', '')
     total = sum(item.total() for item in items)
     
-    order = Order.objects.create(user=request.user, total_price=total, address=address)
-    for item in items:
-        OrderItem.objects.create(
-            order=order,
-            product=item.product,
-            size=item.size,
-            quantity=item.quantity,
-            price=item.product.price
-        )
-        # Reduce stock
-        ps = ProductSize.objects.filter(product=item.product, size=item.size).first()
-        if ps and ps.quantity >= item.quantity:
-            ps.quantity -= item.quantity
-            ps.save()
+    with transaction.atomic():
+        order = Order.objects.create(user=request.user, total_price=total, address=address)
+        for item in items:
+            OrderItem.objects.create(
+                order=order,
+                product=item.product,
+                size=item.size,
+                quantity=item.quantity,
+                price=item.product.price
+            )
+            trending.record(item.product_id, 'purchases', item.quantity)
+            # Reduce stock; the quantity check and decrement are one UPDATE
+            ProductSize.objects.filter(
+                product_id=item.product_id, size=item.size, quantity__gte=item.quantity,
+            ).update(quantity=F('quantity') - item.quantity)
+        product_ids = {item.product_id for item in items}
+        refresh_product_stock(product_ids)
+        items.delete()
+        transaction.on_commit(lambda: [bump_version(pk) for pk in product_ids])
     
-    items.delete()
     messages.success(request, f'Буйрытма #{order.pk} берилди!')
     return redirect('order_detail', pk=order.pk)
 
 
 @login_required
 def order_detail(request, pk):
-    order = get_object_or_404(Order, pk=pk, user=request.user)
-    return render(request, 'kiyim/order_detail.html', {'order': order})
+    order = Order.objects.filter(pk=pk, user=request.user).first()
+    if order is not None:
+        items = order.items.select_related('product__seller')
+    else:
+        # cold orders live in the archive table with the same id
+        order = get_object_or_404(ArchivedOrder, pk=pk, user=request.user)
+        items = order.item_rows()
+    return render(request, 'kiyim/order_detail.html', {'order': order, 'items': items})
 
 
 @login_required
 def orders_list(request):
-    orders = request.user.orders.all().order_by('-created_at')
-    return render(request, 'kiyim/orders_list.html', {'orders': orders})
+    show_archive = request.GET.get('archive') == '1'
+    if show_archive:
+        orders = request.user.archived_orders.order_by('-created_at')
+    else:
+        orders = request.user.orders.annotate(item_count=Count('items')).order_by('-created_at')
+    return render(request, 'kiyim/orders_list.html', {
+        'orders': orders,
+        'show_archive': show_archive,
+        'has_archive': show_archive or request.user.archived_orders.exists(),
+    })
+
+
+def _seller_orders(user):
+    """Сатыўшының өнимлери бар буйрытмалар."""
+    return Order.objects.filter(
+        pk__in=OrderItem.objects.filter(product__seller=user).values('order_id')
+    )
 
 
 @login_required
+@require_POST
 def update_order_status(request, pk):
     if request.user.role != 'seller':
         return redirect('home')
     item = get_object_or_404(OrderItem, pk=pk, product__seller=request.user)
     new_status = request.POST.get('status')
-    item.order.status = new_status
-    item.order.save()
+    if new_status not in ORDER_STATUSES:
+        messages.error(request, 'Статус қәте!')
+        return redirect('seller_dashboard')
+    Order.objects.filter(pk=item.order_id).update(status=new_status)
     messages.success(request, 'Статус жаңаланды!')
     return redirect('seller_dashboard')
 
 
+@login_required
+def seller_orders(request):
+    if request.user.role != 'seller':
+        return redirect('client_dashboard')
+
+    show_archive = request.GET.get('archive') == '1'
+    if show_archive:
+        orders = ArchivedOrder.objects.filter(
+            pk__in=request.user.archived_sales.values('order_id')
+        ).select_related('user').prefetch_related(
+            Prefetch('sale_items', queryset=request.user.archived_sales.order_by('pk'), to_attr='seller_items')
+        ).order_by('-created_at')
+    else:
+        orders = _seller_orders(request.user).select_related('user').prefetch_related(
+            Prefetch(
+                'items',
+                queryset=OrderItem.objects.filter(product__seller=request.user).select_related('product'),
+                to_attr='seller_items',
+            )
+        ).order_by('-created_at')
+
+    status = request.GET.get('status')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+
+    if status in ORDER_STATUSES:
+        orders = orders.filter(status=status)
+    if date_from:
+        try:
+            orders = orders.filter(created_at__date__gte=date_from)
+        except ValidationError:
+            date_from = ''
+    if date_to:
+        try:
+            orders = orders.filter(created_at__date__lte=date_to)
+        except ValidationError:
+            date_to = ''
+
+    page = Paginator(orders, 50).get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+
+    return render(request, 'kiyim/seller_orders.html', {
+        'page': page,
+        'status_choices': Order.STATUS_CHOICES,
+        'current_status': status,
+        'date_from': date_from,
+        'date_to': date_to,
+        'query': query.urlencode(),
+        'show_archive': show_archive,
+        'has_archive': show_archive or request.user.archived_sales.exists(),
+    })
+
+
+@login_required
+@require_POST
+def seller_orders_bulk_status(request):
+    if request.user.role != 'seller':
+        return redirect('home')
+
+    new_status = request.POST.get('status')
+    if new_status not in ORDER_STATUSES:
+        messages.error(request, 'Статус қәте!')
+        return redirect('seller_orders')
+    order_ids = [pk for pk in request.POST.getlist('orders') if pk.isdigit()]
+    if not order_ids:
+        messages.error(request, 'Буйрытма таңлаңыз!')
+        return redirect('seller_orders')
+
+    # Бир UPDATE ... WHERE id IN (...) — тек сол сатыўшының буйрытмалары
+    updated = _seller_orders(request.user).filter(pk__in=order_ids).update(status=new_status)
+    messages.success(request, f'{updated} буйрытма статусы жаңаланды!')
+    next_url = request.POST.get('next', '')
+    if url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+        return redirect(next_url)
+    return redirect('seller_orders')
+
+
+@login_required
+def seller_import(request):
+    if request.user.role != 'seller':
+        return redirect('home')
+
+    report = None
+    if request.method == 'POST':
+        catalog = request.FILES.get('catalog')
+        images_zip = request.FILES.get('images_zip')
+        if not catalog:
+            messages.error(request, 'Файл таңлаңыз!')
+        else:
+            fmt = 'jsonl' if catalog.name.lower().endswith(('.jsonl', '.json')) else 'csv'
+            try:
+                report = import_catalog(request.user, catalog.file, fmt=fmt, images_zip=images_zip)
+            except zipfile.BadZipFile:
+                messages.error(request, 'ZIP файл қәте!')
+            else:
+                if report.file_error:
+                    messages.error(request, report.file_error)
+                messages.success(request, f'{report.created} өним қосылды!')
+
+    return render(request, 'kiyim/seller_import.html', {
+        'report': report,
+        'fields': CATALOG_FIELDS,
+    })
+
+
+@login_required
+def seller_export_catalog(request):
+    if request.user.role != 'seller':
+        return redirect('home')
+    response = StreamingHttpResponse(stream_catalog_csv(request.user), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="catalog.csv"'
+    return response
+
+
+@login_required
+def seller_export_orders(request):
+    if request.user.role != 'seller':
+        return redirect('home')
+    response = StreamingHttpResponse(stream_orders_csv(request.user), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="orders.csv"'
+    return response
+
+
 @login_required
 def profile_edit(request):
     if request.method == 'POST':
@@ -406,11 +583,25 @@ def virtual_tryon(request, product_pk=None):
 
 
 @login_required
+@ratelimit.throttle('run')
+@csrf_exempt
 def tryon_api_run(request):
+    """Адам суретин жадқа емес, уақытша файлға жазып алыў.
+
+    Upload handler-лерди POST оқылмастан алдын алмастырыў керек, сол
+    себепли CSRF тексериўи ишки view-да өтеди.
+    """
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+    return _tryon_api_run(request)
+
+
+@csrf_protect
+def _tryon_api_run(request):
     """replicate Python пакети арқалы IDM-VTON ислетиў"""
     if request.method != 'POST':
         return JsonResponse({'error': 'POST керек'}, status=405)
 
+    started = time.perf_counter()
     api_key    = request.POST.get('api_key', '').strip()
     product_pk = request.POST.get('product_id', '').strip()
     person_file = request.FILES.get('person_image')
@@ -421,12 +612,24 @@ def tryon_api_run(request):
         return JsonResponse({'error': 'Суретиңизди жүклеңиз!'}, status=400)
     if not product_pk:
         return JsonResponse({'error': 'Кийим таңлаңыз!'}, status=400)
+    if person_file.size > settings.TRYON_MAX_UPLOAD_BYTES:
+        return JsonResponse({'error': 'Сурет тым үлкен!'}, status=400)
 
     product = get_object_or_404(Product, pk=product_pk)
     product_img = product.images.first()
     if not product_img:
         return JsonResponse({'error': 'Өнимде сурет жоқ!'}, status=400)
 
+    # Суретлерди модел өлшемине (768×1024) киширейтиў
+    try:
+        human_img, human_meta = prepare_tryon_image(person_file)
+        garm_img, garm_meta = prepare_tryon_image(product_img.image.path)
+    except ImageRejected as e:
+        return JsonResponse({'error': f'{e}!'}, status=400)
+    finally:
+        person_file.close()
+    prepared = time.perf_counter()
+
     try:
         import replicate as _replicate
         import os as _os
@@ -436,36 +639,43 @@ def tryon_api_run(request):
 
         client = _replicate.Client(api_token=api_key)
 
-        # Адам суреті — Django UploadedFile -> bytes
-        person_file.seek(0)
-        person_bytes = person_file.read()
-
-        # Кийим суреті — disk файлынан оқыў
-        garment_path = product_img.image.path
-        with open(garment_path, 'rb') as gf:
-            garment_bytes = gf.read()
-
-        import io as _io
-
         # IDM-VTON модели — файлларды тікелей BytesIO арқалы жибериў
-        prediction = client.predictions.create(
-            version="c871bb9b046607b680449ecbae55fd8c6d945e0a1948644bf2361b3d021d3ff4",
-            input={
-                "human_img":      _io.BytesIO(person_bytes),
-                "garm_img":       _io.BytesIO(garment_bytes),
-                "garment_des":    product.name,
-                "is_checked":     True,
-                "is_checked_crop": False,
-                "denoise_steps":  30,
-                "seed":           42,
-                "category":       _get_category(product.category),
-            }
+        try:
+            # the global slot covers only the outbound call
+            with ratelimit.outbound_call():
+                prediction = client.predictions.create(
+                    version="c871bb9b046607b680449ecbae55fd8c6d945e0a1948644bf2361b3d021d3ff4",
+                    input={
+                        "human_img":      human_img,
+                        "garm_img":       garm_img,
+                        "garment_des":    product.name,
+                        "is_checked":     True,
+                        "is_checked_crop": False,
+                        "denoise_steps":  30,
+                        "seed":           42,
+                        "category":       _get_category(product.category),
+                    }
+                )
+        except ratelimit.Busy:
+            return ratelimit.busy_response()
+        finished = time.perf_counter()
+
+        sent_bytes = human_meta['bytes'] + garm_meta['bytes']
+        logger.info(
+            'tryon run product=%s upload=%dB received=%dB %sx%s->%sx%s prepare=%.0fms upstream=%.0fms total=%.0fms',
+            product.pk, sent_bytes, person_file.size,
+            *human_meta['source_size'], *human_meta['size'],
+            (prepared - started) * 1000, (finished - prepared) * 1000, (finished - started) * 1000,
         )
-
-        return JsonResponse({
+        response = JsonResponse({
             'prediction_id': prediction.id,
             'status': prediction.status,
         })
+        response['Server-Timing'] = (
+            f'prepare;dur={(prepared - started) * 1000:.1f}, '
+            f'upstream;dur={(finished - prepared) * 1000:.1f}'
+        )
+        return response
 
     except Exception as e:
         err = str(e)
@@ -475,6 +685,7 @@ def tryon_api_run(request):
 
 
 @login_required
+@ratelimit.throttle('status')
 def tryon_api_status(request, prediction_id):
     """Prediction статусын текшериў"""
     api_key = request.GET.get('api_key', '').strip()
@@ -512,3 +723,94 @@ def tryon_api_status(request, prediction_id):
 
     except Exception as e:
         return JsonResponse({'error': str(e)[:300]}, status=500)
+
+
+@staff_member_required
+def tryon_api_limits(request):
+    """Rate limit есаплағышлары ҳәм бос емес слотлар (тек staff)."""
+    return JsonResponse({
+        'counters': ratelimit.stats(),
+        'max_concurrent': settings.TRYON_MAX_CONCURRENT,
+        'in_flight': ratelimit.in_flight(),
+    })
+
+
+# ═══════════════════════════════════════════════
+# PROFILING — тек staff ушын
+# ═══════════════════════════════════════════════
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+@staff_member_required
+def profiles_list(request):
+    return render(request, 'kiyim/profiles.html', {'profiles': profiling.list_profiles()})
+
+
+@staff_member_required
+def profile_detail(request, name):
+    prof_path, meta_path = profiling.profile_paths(name)
+    if prof_path is None:
+        raise Http404
+    if request.GET.get('download'):
+        return FileResponse(open(prof_path, 'rb'), as_attachment=True, filename=prof_path.name)
+    meta = json.loads(meta_path.read_text(encoding='utf-8')) if meta_path.exists() else {}
+    sort = request.GET.get('sort', 'cumulative')
+    if sort not in PROFILE_SORT_KEYS:
+        sort = 'cumulative'
+    return render(request, 'kiyim/profiles.html', {
+        'profile': meta,
+        'name': name,
+        'sort': sort,
+        'sort_keys': PROFILE_SORT_KEYS,
+        'stats': profiling.stats_text(prof_path, sort=sort),
+    })
+
+
+# ============================================================
+# READ-ONLY JSON API (v1)
+# ============================================================
+
+def _api_response(data, status=200):
+    return HttpResponse(catalog_api.dumps(data), status=status, content_type='application/json')
+
+
+@require_GET
+@catalog_page(catalog_list_version)
+def api_products(request):
+    try:
+        fields = catalog_api.parse_fields(request.GET.get('fields'))
+        limit = catalog_api.parse_limit(request.GET.get('limit'))
+        items, next_cursor = catalog_api.list_products(request.GET, fields, limit)
+    except catalog_api.ApiError as e:
+        return _api_response({'error': str(e)}, status=400)
+    return _api_response({
+        'version': catalog_api.API_VERSION,
+        'results': items,
+        'next': next_cursor,
+    })
+
+
+@require_GET
+@catalog_page(product_version)
+def api_product(request, pk):
+    try:
+        fields = catalog_api.parse_fields(request.GET.get('fields') or ','.join(catalog_api.ALL_FIELDS))
+    except catalog_api.ApiError as e:
+        return _api_response({'error': str(e)}, status=400)
+    item = catalog_api.get_product(pk, fields)
+    if item is None:
+        return _api_response({'error': 'Өним табылмады'}, status=404)
+    return _api_response({'version': catalog_api.API_VERSION, 'result': item})
+
+
+@require_GET
+def api_products_export(request):
+    try:
+        fields = catalog_api.parse_fields(request.GET.get('fields'))
+        rows = catalog_api.iter_export(request.GET, fields)
+    except catalog_api.ApiError as e:
+        return _api_response({'error': str(e)}, status=400)
+    response = StreamingHttpResponse(rows, content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="products.jsonl"'
+    return response
@@ -0,0 +1,128 @@
+"""Worker ислей баслаўдан алдын қызыў (warm-up).
+
+gunicorn ``--preload`` пенен бул master процессте бир рет орынланады;
+fork етилген worker-лер компиляцияланған шаблонларды, толтырылған URL
+resolver-ди ҳәм аўдарма каталогларын copy-on-write арқалы бөлиседи.
+Fork-тан кейин ҳәр worker ``post_worker_init`` hook-ында
+(``kiyim_platform/gunicorn.conf.py``) ``warmup_worker()`` шақырады:
+өз DB ҳәм кэш байланысларын ашады, master қыздырмаған болса толық
+қыздырыўды өзи орынлайды.
+
+``manage.py warmup`` бөлек процессте ислейди ҳәм worker-лерди
+қыздырмайды: деплойда шаблонлар компиляцияланатуғынын ҳәм индекс
+қурылатуғынын тексереди, бөлисилген кэштен тек версия гилтлерин
+толтырады.
+"""
+import gc
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template import engines
+from django.template.loader import get_template
+from django.urls import NoReverseMatch, get_resolver, reverse
+from django.utils import translation
+
+
+def _template_names():
+    """``templates/kiyim/*.html`` ҳәм app шаблонларының атлары."""
+    names = set()
+    for engine in engines.all():
+        dirs = list(getattr(engine, 'template_dirs', ()))
+        for directory in dirs:
+            root = Path(directory)
+            for path in (root / 'kiyim').glob('*.html'):
+                names.add(path.relative_to(root).as_posix())
+    return sorted(names)
+
+
+def compile_templates():
+    names = _template_names()
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def resolve_urls():
+    """URL resolver-ди толтырып, аргументсиз ҳәр атты reverse етиў."""
+    resolver = get_resolver()
+    resolver._populate()
+    count = 0
+    for name in list(resolver.reverse_dict):
+        if not isinstance(name, str):
+            continue
+        try:
+            reverse(name)
+        except NoReverseMatch:
+            # needs args; the reverse_dict entry itself is already built
+            pass
+        count += 1
+    return count
+
+
+def prime_caches():
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('')
+    translation.deactivate()
+    for model in apps.get_models():
+        model._meta.get_fields()
+    from PIL import Image
+    Image.init()
+
+
+def build_search_index():
+    from .autocomplete import get_index
+    return len(get_index().keys)
+
+
+def warmup():
+    """Барлық қадамларды орынлап, ҳәр биреўиниң ўақытын (мс) қайтарыў."""
+    timings = {}
+    started = time.perf_counter()
+    for step in (compile_templates, resolve_urls, prime_caches, build_search_index):
+        t0 = time.perf_counter()
+        result = step()
+        timings[step.__name__] = ((time.perf_counter() - t0) * 1000, result)
+    timings['total'] = ((time.perf_counter() - started) * 1000, None)
+    return timings
+
+
+_warmed_before_fork = False
+
+
+def warmup_before_fork():
+    """wsgi.py-дан шақырылады: қыздырып, fork-тан алдын жағдайды таярлаў."""
+    global _warmed_before_fork
+    timings = warmup()
+    _warmed_before_fork = True
+    # SQLite connections must not be shared across forked workers
+    connections.close_all()
+    # Keep warmed objects out of GC generations so workers don't touch their pages
+    gc.collect()
+    gc.freeze()
+    return timings
+
+
+def open_connections():
+    """Worker-диң DB ҳәм кэш байланысларын биринши сораўдан алдын ашыў."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    for cache in caches.all():
+        cache.get('warmup')
+    return len(connections.all())
+
+
+def warmup_worker():
+    """gunicorn ``post_worker_init``-тен шақырылады (fork-тан кейин, ҳәр worker-де)."""
+    if not _warmed_before_fork:
+        # no --preload (or WARMUP_ON_BOOT off): each worker warms itself
+        timings = warmup()
+    else:
+        timings = {}
+    t0 = time.perf_counter()
+    result = open_connections()
+    timings['open_connections'] = ((time.perf_counter() - t0) * 1000, result)
+    return timings
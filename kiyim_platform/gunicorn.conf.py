@@ -0,0 +1,9 @@
+# gunicorn -c kiyim_platform/gunicorn.conf.py (see deploy_vps.sh)
+
+
+def post_worker_init(worker):
+    # runs in every worker after fork, before it accepts requests
+    from kiyim.warmup import warmup_worker
+
+    timings = warmup_worker()
+    worker.log.info('warm-up: %s', ', '.join(f'{step} {ms:.1f} ms' for step, (ms, _) in timings.items()))
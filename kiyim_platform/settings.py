@@ -19,7 +19,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'kiyim.profiling.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'kiyim.db_router.StickyWritesMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -55,6 +57,19 @@ DATABASES = {
     }
 }
 
+# Каталог оқыўлары ушын ``read`` алиасы (реплика яки снапшот) қосылса,
+# роутер усы моделлердиң оқыўларын соған жибереди. Жазыўдан кейин
+# сессия DB_STICKY_SECONDS даўамында ``default``-тан оқыйды.
+DATABASE_ROUTERS = ['kiyim.db_router.ReadWriteRouter']
+DB_READ_MODELS = {'kiyim.product', 'kiyim.productimage', 'kiyim.productsize', 'kiyim.review'}
+DB_UNTRACKED_WRITE_MODELS = {
+    'sessions.session', 'kiyim.ratelimitbucket', 'kiyim.tryonslot', 'kiyim.ratelimitcounter',
+}
+DB_STICKY_SECONDS = 10
+# Реплика ``default``-тан ең көп неше секунд артта қалады (SQLite снапшотында
+# орнына файлдың mtime қолланылады)
+DB_READ_MAX_LAG_SECONDS = 5
+
 AUTH_USER_MODEL = 'kiyim.User'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -69,4 +84,57 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Жабық медиа: тек ийесине ҳәм staff-қа (kiyim.media). Байтларды ким жибереди:
+# 'django' (FileResponse, Range), 'nginx' (X-Accel-Redirect) яки 'sendfile' (X-Sendfile)
+PRIVATE_MEDIA_PREFIXES = ['avatars/', 'tryon/']
+MEDIA_SERVE_MODE = 'django'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Virtual try-on: IDM-VTON кириў өлшеми ҳәм жүклеў шеклери
+TRYON_INPUT_SIZE = (768, 1024)
+TRYON_MAX_UPLOAD_BYTES = 15 * 1024 * 1024
+TRYON_MAX_INPUT_PIXELS = 40_000_000
+
+# Trending: ҳәр сигналдың салмағы ҳәм ярым ыдыраў ўақты (саат)
+TRENDING_HALF_LIFE_HOURS = 72
+TRENDING_WEIGHTS = {'views': 1.0, 'cart_adds': 4.0, 'purchases': 10.0}
+TRENDING_WINDOW_HALF_LIVES = 8
+
+# Каталог импорты: ZIP ишиндеги бир суреттиң ең үлкен өлшеми (байт)
+IMPORT_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Өним бети снапшоты кэште қанша сақланады (секунд)
+PRODUCT_SNAPSHOT_TTL = 600
+
+# Retention: себет қатарлары неше күннен соң өшириледи, жабық буйрытмалар
+# неше айдан соң архивке көшириледи; топтам өлшеми ҳәм топтамлар арасындағы тыным
+CART_TTL_DAYS = 30
+ORDER_ARCHIVE_AFTER_MONTHS = 12
+RETENTION_BATCH_SIZE = 500
+RETENTION_PAUSE_SECONDS = 0.2
+
+# Autocomplete индекси: каталог версиясын тексериў аралығы (секунд) ҳәм
+# бир процесстеги индекс ушын жад шеги (MB)
+AUTOCOMPLETE_REFRESH_SECONDS = 5
+AUTOCOMPLETE_MEMORY_BUDGET_MB = 32
+
+# Аноним каталог беттерин nginx қанша секунд сақлайды (X-Accel-Expires); 0 — өширилген
+CATALOG_MICROCACHE_SECONDS = 0
+
+# Try-on rate limit: rol -> {scope: (сораўлар саны, секунд)}
+TRYON_RATE_LIMITS = {
+    'default': {'run': (3, 60), 'status': (30, 60)},
+    'client': {'run': (5, 60), 'status': (40, 60)},
+    'staff': {'run': (20, 60), 'status': (120, 60)},
+}
+TRYON_MAX_CONCURRENT = 4
+TRYON_SLOT_TIMEOUT = 130
+TRYON_BUSY_RETRY_AFTER = 5
+
+# Профиллеў: X-Profile header-индеги токенлер яки тосаттан таңлаў үлеси
+PROFILING_TOKENS = []
+PROFILING_SAMPLE_RATE = 0.0
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 50
@@ -1,4 +1,5 @@
 from .settings import *  # noqa: F403,F401
+import copy
 import os
 
 
@@ -10,9 +11,23 @@ def _as_bool(value: str, default: bool = False) -> bool:
 
 DEBUG = _as_bool(os.getenv("DJANGO_DEBUG"), default=False)
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", SECRET_KEY)  # noqa: F405
-SERVE_MEDIA_WITH_DJANGO = _as_bool(os.getenv("DJANGO_SERVE_MEDIA"), default=True)
+SERVE_MEDIA_WITH_DJANGO = _as_bool(os.getenv("DJANGO_SERVE_MEDIA"), default=False)
 SERVE_STATIC_WITH_DJANGO = _as_bool(os.getenv("DJANGO_SERVE_STATIC"), default=True)
 BEHIND_HTTPS_PROXY = _as_bool(os.getenv("DJANGO_BEHIND_HTTPS"), default=False)
+WARMUP_ON_BOOT = _as_bool(os.getenv("DJANGO_WARMUP_ON_BOOT"), default=True)
+
+# Compiled templates are kept for the life of the worker regardless of DEBUG.
+TEMPLATES = copy.deepcopy(TEMPLATES)  # noqa: F405
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
 
 _default_hosts = "127.0.0.1,localhost"
 ALLOWED_HOSTS = [  # noqa: F405
@@ -29,12 +44,86 @@ if _csrf_origins.strip():
         if origin.strip()
     ]
 
+# Shared by all gunicorn workers, so cache version bumps are seen everywhere.
+# The file cache's add() is check-then-set, so the product snapshot rebuild lock
+# is best-effort there; set DJANGO_REDIS_URL (needs the "redis" package) for an
+# atomic add().
+if os.getenv("DJANGO_REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("DJANGO_REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("DJANGO_CACHE_DIR", str(BASE_DIR / "cache")),  # noqa: F405
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("DJANGO_CACHE_MAX_ENTRIES", "20000"))},
+        }
+    }
+
+# Optional read-only copy for catalog reads: a PostgreSQL replica or an SQLite
+# snapshot refreshed by `manage.py snapshot_read_db`.
+if os.getenv("DJANGO_READ_DB_NAME"):
+    DATABASES = copy.deepcopy(DATABASES)  # noqa: F405
+    DATABASES["read"] = {
+        "ENGINE": os.getenv("DJANGO_READ_DB_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.getenv("DJANGO_READ_DB_NAME"),
+        "USER": os.getenv("DJANGO_READ_DB_USER", ""),
+        "PASSWORD": os.getenv("DJANGO_READ_DB_PASSWORD", ""),
+        "HOST": os.getenv("DJANGO_READ_DB_HOST", ""),
+        "PORT": os.getenv("DJANGO_READ_DB_PORT", ""),
+        "TEST": {"MIRROR": "default"},
+    }
+# Seconds a session keeps reading from "default" after it wrote something;
+# with a snapshot keep it above the snapshot interval.
+DB_STICKY_SECONDS = int(os.getenv("DJANGO_DB_STICKY_SECONDS", "10"))
+# Upper bound on replica lag; caches keyed by a newer version are built from "default".
+DB_READ_MAX_LAG_SECONDS = float(os.getenv("DJANGO_DB_READ_MAX_LAG_SECONDS", "5"))
+
+# nginx micro-caches anonymous catalog pages for this many seconds.
+CATALOG_MICROCACHE_SECONDS = int(os.getenv("DJANGO_CATALOG_MICROCACHE_SECONDS", "5"))
+
+# Session storage: "cached_db" (default), "signed_cookies" or "db".
+SESSION_MODE = os.getenv("DJANGO_SESSION_MODE", "cached_db").strip().lower()
+SESSION_ENGINE = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}.get(SESSION_MODE, "django.contrib.sessions.backends.cached_db")
+if SESSION_MODE == "signed_cookies":
+    SESSION_COOKIE_HTTPONLY = True
+
+# Authenticated requests load the User row from the cache, not SQLite.
+# ModelBackend stays listed so sessions logged in before the switch keep
+# working; new logins are stored with the cached backend's path.
+if _as_bool(os.getenv("DJANGO_CACHED_AUTH"), default=True):
+    AUTHENTICATION_BACKENDS = [
+        "kiyim.auth_backends.CachedModelBackend",
+        "django.contrib.auth.backends.ModelBackend",
+    ]
+
+# On-demand profiling: send "X-Profile: <token>" or sample a share of requests.
+PROFILING_TOKENS = [
+    token.strip()
+    for token in os.getenv("DJANGO_PROFILING_TOKENS", "").split(",")
+    if token.strip()
+]
+PROFILING_SAMPLE_RATE = float(os.getenv("DJANGO_PROFILING_SAMPLE_RATE", "0") or 0)
+PROFILING_DIR = os.getenv("DJANGO_PROFILING_DIR", str(BASE_DIR / "profiles"))  # noqa: F405
+PROFILING_MAX_FILES = int(os.getenv("DJANGO_PROFILING_MAX_FILES", "50"))
+
 STATIC_ROOT = BASE_DIR / "staticfiles"  # noqa: F405
 if not (BASE_DIR / "static").exists():  # noqa: F405
     STATICFILES_DIRS = []  # noqa: F405
 
 MEDIA_ROOT = BASE_DIR / "media"  # noqa: F405
 MEDIA_URL = "/media/"
+# nginx sends public media itself; private media gets an X-Accel-Redirect.
+MEDIA_SERVE_MODE = os.getenv("DJANGO_MEDIA_SERVE_MODE", "nginx").strip().lower()
+MEDIA_ACCEL_PREFIX = os.getenv("DJANGO_MEDIA_ACCEL_PREFIX", "/protected-media/")
 
 if not DEBUG and BEHIND_HTTPS_PROXY:
     SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -1,4 +1,10 @@
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kiyim_platform.settings')
 application = get_wsgi_application()
+
+# gunicorn --preload: warm up once in the master, workers inherit it on fork
+if getattr(settings, 'WARMUP_ON_BOOT', False):
+    from kiyim.warmup import warmup_before_fork
+    warmup_before_fork()